@@ -1,10 +1,114 @@
-from .bibauthorid import *
-from .bibclassify import *
-from .bibexport import *
-from .bibknowledge import *
-from .bibrank import *
-from .oai_harvest import *
-from .webjournal import *
-from .websearch import *
-from .websession import *
-from .websubmit import *
+# -*- coding: utf-8 -*-
+##
+## This file is part of Invenio.
+## Copyright (C) 2013 CERN.
+##
+## Invenio is free software; you can redistribute it and/or
+## modify it under the terms of the GNU General Public License as
+## published by the Free Software Foundation; either version 2 of the
+## License, or (at your option) any later version.
+##
+## Invenio is distributed in the hope that it will be useful, but
+## WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+## General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with Invenio; if not, write to the Free Software Foundation, Inc.,
+## 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
+
+"""CDS fixtures.
+
+The fixture modules define thousands of classes, so they are not imported
+with the package.  Every data set is registered by name in :data:`FIXTURES`
+and its module is imported the first time the data set is accessed; listing
+the package (``dir()``), as fixture discovery does, imports all of them.
+"""
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+FIXTURES = {
+    'AidPERSONIDDATAData': 'bibauthorid',
+    'ClsMETHODData': 'bibclassify',
+    'CollectionClsMETHODData': 'bibclassify',
+    'ExpJOBData': 'bibexport',
+    'KnwKBData': 'bibknowledge',
+    'KnwKBRVALData': 'bibknowledge',
+    'RnkMETHODData': 'bibrank',
+    'CollectionRnkMETHODData': 'bibrank',
+    'OaiREPOSITORYData': 'oai_harvest',
+    'JrnJOURNALData': 'webjournal',
+    'JrnISSUEData': 'webjournal',
+    'UserData': 'websession',
+    'UsergroupData': 'websession',
+    'UserUsergroupData': 'websession',
+    'SbmCOLLECTIONData': 'websubmit',
+    'SbmCOLLECTIONSbmCOLLECTIONData': 'websubmit',
+    'SbmDOCTYPEData': 'websubmit',
+    'SbmCOLLECTIONSbmDOCTYPEData': 'websubmit',
+    'SbmCATEGORIESData': 'websubmit',
+    'SbmFIELDData': 'websubmit',
+    'SbmFIELDDESCData': 'websubmit',
+    'SbmFUNCTIONSData': 'websubmit',
+    'SbmIMPLEMENTData': 'websubmit',
+    'SbmPARAMETERSData': 'websubmit',
+}
+"""Module defining each data set (data sets of other modules are found by
+importing them in :data:`FIXTURE_MODULES` order)."""
+
+FIXTURE_MODULES = ('bibauthorid', 'bibclassify', 'bibexport', 'bibknowledge',
+                   'bibrank', 'oai_harvest', 'webjournal', 'websession',
+                   'websubmit', )
+"""Fixture modules, in the order their names were exported."""
+
+
+class LazyFixtures(ModuleType):
+
+    """Package module importing the fixture modules on demand."""
+
+    def __getattr__(self, name):
+        if name == '__all__':
+            self.load_all()
+            return [key for key in self.__dict__ if not key.startswith('_')
+                    and key not in ('FIXTURES', 'FIXTURE_MODULES',
+                                    'LazyFixtures')]
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name in FIXTURES:
+            modules = [FIXTURES[name]]
+        else:
+            modules = FIXTURE_MODULES
+        for module_name in modules:
+            module = import_module('.' + module_name, __name__)
+            if hasattr(module, name):
+                value = getattr(module, name)
+                setattr(self, name, value)
+                return value
+        raise AttributeError(name)
+
+    def __dir__(self):
+        self.load_all()
+        return sorted(self.__dict__)
+
+    def load_all(self):
+        """Import every fixture module and export its public names."""
+        for module_name in FIXTURE_MODULES:
+            module = import_module('.' + module_name, __name__)
+            names = getattr(module, '__all__', None) or [
+                name for name in dir(module) if not name.startswith('_')]
+            for name in names:
+                if name not in FIXTURE_MODULES:
+                    self.__dict__.setdefault(name, getattr(module, name))
+
+
+_package = sys.modules[__name__]
+_lazy = LazyFixtures(__name__, __doc__)
+_lazy.__dict__.update(
+    (name, value) for name, value in vars(_package).items()
+    if name.startswith('__') or name in ('FIXTURES', 'FIXTURE_MODULES',
+                                         'LazyFixtures'))
+# Keep a reference, the globals of a collected module are cleared.
+_lazy._package = _package
+sys.modules[__name__] = _lazy
@@ -18,7 +18,11 @@
 ## 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
 
 from fixture import DataSet
-from .websearch import CollectionData
+
+# Collections are loaded from the mixer sources (cds/base/mixer), so they
+# are referenced by the identifiers of sources/collection.json.
+_EXPERIMENTAL_PHYSICS_ID = 240
+_PREPRINTS_ID = 11
 
 
 class ClsMETHODData(DataSet):
@@ -42,8 +46,8 @@ class CollectionClsMETHODData(DataSet):
 
     class CollectionClsMETHOD_12_2:
         id_clsMETHOD = ClsMETHODData.ClsMETHOD_2.ref('id')
-        id_collection = CollectionData.experimentalPhysics.ref('id')
+        id_collection = _EXPERIMENTAL_PHYSICS_ID
 
     class CollectionClsMETHOD_2_1:
         id_clsMETHOD = ClsMETHODData.ClsMETHOD_1.ref('id')
-        id_collection = CollectionData.preprints.ref('id')
+        id_collection = _PREPRINTS_ID
@@ -18,8 +18,11 @@
 ## 59 Temple Place, Suite 330, Boston, MA 02111-1307, USA.
 
 from fixture import DataSet
-from .websearch import \
-    CollectionData as CollectionDataDemosite
+
+# Collections are loaded from the mixer sources (cds/base/mixer), so they
+# are referenced by the identifiers of sources/collection.json.
+_ARTICLES_PREPRINTS_ID = 250
+_SITE_COLLECTION_ID = 1
 
 
 class RnkMETHODData(DataSet):
@@ -54,45 +57,60 @@ class RnkMETHODData(DataSet):
         id = 7
         name = u'selfcites'
 
+    class RnkMETHOD_8:
+        last_updated = None
+        id = 8
+        name = u'blend'
+
 
 class CollectionRnkMETHODData(DataSet):
 
+    class CollectionRnkMETHOD_15_8:
+        score = 100
+        id_rnkMETHOD = RnkMETHODData.RnkMETHOD_8.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
+
     class CollectionRnkMETHOD_15_2:
         score = 90
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_2.ref('id')
-        id_collection = CollectionDataDemosite.articlesPreprints.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
 
     class CollectionRnkMETHOD_15_3:
         score = 80
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_3.ref('id')
-        id_collection = CollectionDataDemosite.articlesPreprints.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
 
     class CollectionRnkMETHOD_15_4:
         score = 70
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_4.ref('id')
-        id_collection = CollectionDataDemosite.articlesPreprints.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
 
     class CollectionRnkMETHOD_15_5:
         score = 60
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_5.ref('id')
-        id_collection = CollectionDataDemosite.articlesPreprints.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
 
     class CollectionRnkMETHOD_15_6:
         score = 50
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_6.ref('id')
-        id_collection = CollectionDataDemosite.articlesPreprints.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
 
     class CollectionRnkMETHOD_15_7:
         score = 80
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_7.ref('id')
-        id_collection = CollectionDataDemosite.articlesPreprints.ref('id')
+        id_collection = _ARTICLES_PREPRINTS_ID
 
     class CollectionRnkMETHOD_1_3:
         score = 10
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_3.ref('id')
-        id_collection = CollectionDataDemosite.siteCollection.ref('id')
+        id_collection = _SITE_COLLECTION_ID
 
     class CollectionRnkMETHOD_1_7:
         score = 10
         id_rnkMETHOD = RnkMETHODData.RnkMETHOD_7.ref('id')
-        id_collection = CollectionDataDemosite.siteCollection.ref('id')
+        id_collection = _SITE_COLLECTION_ID
+
+    class CollectionRnkMETHOD_1_8:
+        score = 100
+        id_rnkMETHOD = RnkMETHODData.RnkMETHOD_8.ref('id')
+        id_collection = _SITE_COLLECTION_ID
@@ -21,6 +21,9 @@ def get_bibdoc(recid):
     """
     Retrieves using BibDoc all the files related with a given record
 
+    The object is shared through the record file cache of the current
+    request (see `cds.modules.recordfiles.api.current_cache`).
+
     @param recid
 
     @return BibDoc of the given record
@@ -28,8 +31,5 @@ def get_bibdoc(recid):
     if not recid or recid < 0:
         return None
 
-    from invenio.legacy.bibdocfile.api import BibDoc, InvenioBibDocFileError
-    try:
-        return BibDoc(int(recid))
-    except InvenioBibDocFileError:
-        return None
+    from cds.modules.recordfiles.api import current_cache
+    return current_cache().get_bibdoc(recid)
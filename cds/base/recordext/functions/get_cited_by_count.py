@@ -22,10 +22,18 @@ def get_cited_by_count(recid):
     """
     Return how many records cite given record.
 
+    The count is read from the citation count array, or from
+    `record_counters` if the array was never built or is older than the
+    last run of the citation indexer.
+
     @param recid:
 
     @return: Number of records citing given record
     """
-    from invenio.legacy.bibrank.citation_searcher import get_cited_by_count
+    from cds.modules.counters.api import get_counter
+    from cds.modules.counters.citations import get_citation_count
     if recid:
-        return get_cited_by_count(recid)
+        count = get_citation_count(recid)
+        if count is None:
+            count = get_counter('cited_by_count', recid)
+        return count
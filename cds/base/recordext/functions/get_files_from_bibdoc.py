@@ -21,6 +21,10 @@ def get_files_from_bibdoc(recid):
     """
     Retrieves using BibDoc all the files related with a given record
 
+    The files are read from the record file cache of the current request
+    (see `cds.modules.recordfiles.api.current_cache`), which may have been
+    filled in bulk by `cds.modules.recordfiles.api.prefetch_files`.
+
     @param recid
 
     @return List of dictionaries containing all the information stored
@@ -30,29 +34,5 @@ def get_files_from_bibdoc(recid):
     if not recid or recid < 0:
         return []
 
-    from invenio.legacy.bibdocfile.api import BibRecDocs, InvenioBibDocFileError
-    files = []
-    try:
-        bibrecdocs = BibRecDocs(int(recid))
-    except InvenioBibDocFileError:
-        return []
-    latest_files = bibrecdocs.list_latest_files()
-    for afile in latest_files:
-        file_dict = {}
-        file_dict['comment'] = afile.get_comment()
-        file_dict['description'] = afile.get_description()
-        file_dict['eformat'] = afile.get_format()
-        file_dict['full_name'] = afile.get_full_name()
-        file_dict['full_path'] = afile.get_full_path()
-        file_dict['magic'] = afile.get_magic()
-        file_dict['name'] = afile.get_name()
-        file_dict['path'] = afile.get_path()
-        file_dict['size'] = afile.get_size()
-        file_dict['status'] = afile.get_status()
-        file_dict['subformat'] = afile.get_subformat()
-        file_dict['superformat'] = afile.get_superformat()
-        file_dict['type'] = afile.get_type()
-        file_dict['url'] = afile.get_url()
-        file_dict['version'] = afile.get_version()
-        files.append(file_dict)
-    return files
+    from cds.modules.recordfiles.api import current_cache
+    return current_cache().get_files(recid)
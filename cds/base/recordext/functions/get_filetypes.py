@@ -25,9 +25,12 @@ def get_filetypes(recid):
         Takes as a parameter the recid of a record.
         @param url_field: recid of a record
     """
-    from invenio.legacy.bibdocfile.api import BibRecDocs
-    docs = BibRecDocs(recid)
-    return [_get_filetype(d.format) for d in docs.list_latest_files()]
+    if not recid:
+        return []
+
+    from cds.modules.recordfiles.api import current_cache
+    return [_get_filetype(f['eformat'])
+            for f in current_cache().get_files(recid)]
 
 
 def _get_filetype(pre_ext):
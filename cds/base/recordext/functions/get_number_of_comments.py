@@ -20,12 +20,12 @@
 
 def get_number_of_comments(recid):
     """
-    Returns number of comments for given record.
+    Returns number of comments for given record (from `record_counters`).
 
     :param recid:
 
     :return: Number of comments
     """
-    from invenio.legacy.webcomment.adminlib import get_nb_comments
+    from cds.modules.counters.api import get_counter
     if recid:
-        return get_nb_comments(recid)
+        return get_counter('number_of_comments', recid)
@@ -22,13 +22,18 @@ def get_number_of_copies(recid):
     """
     Searches inside crcITEM for the number of appearances of recid
 
+    The value is read through `cds.modules.counters.copies`.  When the
+    database fails or does not answer in time the field is `None`; the
+    failure is not cached, the next read tries again.
+
     @param recid:
 
-    @return: Number of copies
+    @return: Number of copies or `None` if it could not be read
     """
-    from invenio.legacy.dbquery import run_sql
+    from cds.modules.counters.copies import get_number_of_copies
+    from cds.modules.counters.errors import CounterLookupError
     if recid:
         try:
-            return run_sql('SELECT COUNT(*) FROM crcITEM WHERE id_bibrec=%s', (recid,))[0][0]
-        except:
-            return -1
+            return get_number_of_copies(recid)
+        except CounterLookupError:
+            return None
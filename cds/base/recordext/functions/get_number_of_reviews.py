@@ -20,12 +20,12 @@
 
 def get_number_of_reviews(recid):
     """
-    Returns number of reviews for given record.
+    Returns number of reviews for given record (from `record_counters`).
 
     :param recid:
 
     :return: Number of reviews
     """
-    from invenio.legacy.webcomment.adminlib import get_nb_reviews
+    from cds.modules.counters.api import get_counter
     if recid:
-        return get_nb_reviews(recid)
+        return get_counter('number_of_reviews', recid)
@@ -23,3 +23,24 @@ from flask import Blueprint
 
 blueprint = Blueprint('cds', __name__, url_prefix='/',
                       template_folder='templates', static_folder='static')
+
+
+@blueprint.app_template_global()
+def latest_records(collection, n=10):
+    """Return the ``n`` latest records of ``collection``, newest first."""
+    from cds.modules.collectiontree.api import get_latest_records
+    return get_latest_records(collection, n)
+
+
+@blueprint.app_template_global()
+def collection_size(collection):
+    """Return the number of records of ``collection``."""
+    from cds.modules.collectiontree.api import get_collection_size
+    return get_collection_size(collection)
+
+
+@blueprint.app_template_global()
+def format_records(recids, of, ln=None, **kwargs):
+    """Format ``recids`` together, see :mod:`cds.modules.formatcache.api`."""
+    from cds.modules.formatcache.api import format_records
+    return format_records(recids, of, ln=ln, **kwargs)
@@ -36,6 +36,8 @@ point specified in the setup.py::
 
 from __future__ import unicode_literals
 
+import os
+
 from invenio.base.config import PACKAGES as _PACKAGES
 
 
@@ -79,8 +81,47 @@ EXTENSIONS = [
     'invenio.ext.menu',
     'flask.ext.breadcrumbs:Breadcrumbs',
     'invenio.modules.deposit.url_converters',
+    'cds.ext.fielddefs',
+    'cds.ext.kbcache',
+    'cds.ext.ranking',
 ]
 
+APP_ROLE = os.environ.get('CDS_APP_ROLE', 'web')
+"""Role of the process: ``web``, ``worker`` (bibsched tasks) or ``cli``."""
+
+APP_ROLE_EXCLUDE_EXTENSIONS = {
+    'web': [],
+    'worker': [
+        'invenio.ext.debug_toolbar',
+        'invenio.ext.sslify',
+        'invenio.ext.fixtures',
+        'invenio.ext.mixer',
+        'invenio.ext.assets',
+        'invenio.ext.admin',
+        'invenio.ext.gravatar',
+        'invenio.ext.collect',
+        'invenio.ext.restful',
+        'invenio.ext.menu',
+        'flask.ext.breadcrumbs:Breadcrumbs',
+    ],
+    'cli': [
+        'invenio.ext.debug_toolbar',
+        'invenio.ext.sslify',
+        'invenio.ext.gravatar',
+        'invenio.ext.restful',
+        'invenio.ext.menu',
+        'flask.ext.breadcrumbs:Breadcrumbs',
+    ],
+}
+"""Extensions a role does not need; ``web`` loads all of them."""
+
+if APP_ROLE not in APP_ROLE_EXCLUDE_EXTENSIONS:
+    raise ValueError('Invalid CDS_APP_ROLE %r, expected one of: %s' % (
+        APP_ROLE, ', '.join(sorted(APP_ROLE_EXCLUDE_EXTENSIONS))))
+
+EXTENSIONS = [ext for ext in EXTENSIONS
+              if ext not in APP_ROLE_EXCLUDE_EXTENSIONS[APP_ROLE]]
+
 
 CFG_SITE_NAME = "CERN Document Server"
 CFG_SITE_NAME_INTL = {
@@ -36,11 +36,13 @@ option_yes_i_know = manager.option('--yes-i-know', action='store_true',
                                    dest='yes_i_know', help='use with care!')
 
 @option_yes_i_know
-def populate(yes_i_know=False):
+@manager.option('-j', '--jobs', dest='jobs', type=int, default=4,
+                help='maximum number of tasks running at the same time')
+def populate(yes_i_know=False, jobs=4):
     """Load CDS general demorecords."""
     from invenio.utils.text import wrap_text_in_a_box, wait_for_user
     from invenio.config import CFG_PREFIX
-    from invenio.modules.scheduler.models import SchTASK
+    from .runner import Step, print_report, run_steps
 
     wait_for_user(wrap_text_in_a_box(
         "WARNING: You are going to override data in tables!"
@@ -51,25 +53,47 @@ def populate(yes_i_know=False):
         'cds',
         os.path.join('demosite', 'data', 'cds-demobibdata.xml'))
 
-    job_id = SchTASK.query.count()
-
-    for cmd in ["bin/bibupload -u admin -i %s" % (xml_data, ),
-                "bin/bibupload %d" % (job_id + 1, ),
-                "bin/bibindex -u admin",
-                "bin/bibindex %d" % (job_id + 2,),
-                "bin/bibindex -u admin -w global",
-                "bin/bibindex %d" % (job_id + 3,),
-                "bin/bibreformat -u admin -o HB",
-                "bin/bibreformat %d" % (job_id + 4,),
-                "bin/webcoll -u admin",
-                "bin/webcoll %d" % (job_id + 5,),
-                ]:
-        cmd = os.path.join(CFG_PREFIX, cmd)
-        if os.system(cmd):
-            print("ERROR: failed execution of", cmd)
-            sys.exit(1)
+    def binary(name):
+        return os.path.join(CFG_PREFIX, 'bin', name)
+
+    steps = [
+        Step('upload', [binary('bibupload'), '-i', xml_data]),
+        Step('index_global', [binary('bibindex'), '-w', 'global'],
+             requires=['upload']),
+        Step('reformat', [binary('bibreformat'), '-o', 'HB'],
+             requires=['upload']),
+        # bibindex runs one after the other as they share the word tables.
+        Step('index', [binary('bibindex')], requires=['index_global']),
+        Step('webcoll', [binary('webcoll')], requires=['index', 'reformat']),
+    ]
+    results = run_steps(steps, max_workers=jobs)
+    print_report(results)
+    if any(result['status'] != 'ok' for result in results.values()):
+        print("ERROR: failed to load the demo records.")
+        sys.exit(1)
     print(">>> CDS Demo records loaded successfully.")
 
+
+@manager.option('-j', '--jobs', dest='jobs', type=int, default=None,
+                help='number of worker processes (default: number of CPUs)')
+@manager.option('-o', '--output', dest='output', required=True,
+                help='JSON lines output file')
+def convert(output, jobs=None):
+    """Convert CDS general demorecords to JSON."""
+    import json
+    from cds.modules.ingest.pipeline import parallel_convert
+
+    xml_data = pkg_resources.resource_filename(
+        'cds',
+        os.path.join('demosite', 'data', 'cds-demobibdata.xml'))
+
+    print(">>> Going to convert demo records...")
+    with open(output, 'w') as stream:
+        for record in parallel_convert(xml_data, jobs):
+            stream.write(json.dumps(record, default=str))
+            stream.write('\n')
+    print(">>> CDS Demo records converted successfully.")
+
 def main():
     """Execute manager."""
     from invenio.base.factory import create_app
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Dependency aware runner for bibsched tasks.
+
+Each step submits a task with ``-u admin``, reads the real task identifier
+from the output of the submission and runs that task.  Steps whose
+requirements are met run concurrently; after a failure no new step starts
+and the report tells which steps failed or were skipped.
+"""
+
+from __future__ import print_function
+
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+from six.moves import queue
+
+TASK_ID_RE = re.compile(r'Task #(\d+) submitted')
+
+
+class StepError(Exception):
+
+    """A step did not complete."""
+
+
+class Step(object):
+
+    """Bibsched task to submit and run once its requirements succeeded."""
+
+    def __init__(self, name, command, requires=()):
+        """Initialize the step.
+
+        :param name: unique name of the step
+        :param command: submission command, as a list of arguments, without
+            the ``-u admin`` option
+        :param requires: names of the steps that must succeed first
+        """
+        self.name = name
+        self.command = list(command)
+        self.requires = tuple(requires)
+        self.task_id = None
+
+    def submit(self):
+        """Submit the task and return its identifier."""
+        output = subprocess.check_output(
+            self.command[:1] + ['-u', 'admin'] + self.command[1:],
+            stderr=subprocess.STDOUT)
+        match = TASK_ID_RE.search(output.decode('utf-8', 'replace'))
+        if match is None:
+            raise StepError('no task identifier in %r' % output)
+        self.task_id = int(match.group(1))
+        return self.task_id
+
+    def run(self):
+        """Submit and run the task."""
+        self.submit()
+        returncode = subprocess.call([self.command[0], str(self.task_id)])
+        if returncode:
+            raise StepError('task #%d exited with %d' % (self.task_id,
+                                                       returncode))
+
+
+def run_steps(steps, max_workers=4):
+    """Run ``steps`` respecting their requirements.
+
+    :return: ordered dictionary ``{name: result}`` where result has the
+        ``status`` (``'ok'``, ``'failed'`` or ``'skipped'``), ``task_id``,
+        ``duration`` in seconds and ``error`` of the step; steps left in a
+        requirement cycle are reported as skipped
+    """
+    pending = OrderedDict((step.name, step) for step in steps)
+    results = OrderedDict((step.name, {'status': 'skipped', 'task_id': None,
+                                       'duration': 0.0, 'error': None})
+                          for step in steps)
+    for step in steps:
+        unknown = set(step.requires) - set(results)
+        if unknown:
+            raise ValueError('%s requires unknown steps %s' % (
+                step.name, ', '.join(sorted(unknown))))
+    finished = queue.Queue()
+    running = set()
+    failed = False
+
+    def execute(step):
+        start = time.time()
+        try:
+            step.run()
+            status, error = 'ok', None
+        except Exception as e:
+            status, error = 'failed', str(e)
+        finished.put((step, status, error, time.time() - start))
+
+    while pending or running:
+        if not failed:
+            for name, step in list(pending.items()):
+                if len(running) >= max_workers:
+                    break
+                if all(results[r]['status'] == 'ok'
+                       for r in step.requires):
+                    del pending[name]
+                    running.add(name)
+                    print(">>> Starting", name)
+                    threading.Thread(target=execute, args=(step, )).start()
+        if not running:
+            break
+        step, status, error, duration = finished.get()
+        running.discard(step.name)
+        results[step.name].update(status=status, task_id=step.task_id,
+                                  error=error, duration=duration)
+        print(">>> Finished %s (%s, %.1fs)" % (step.name, status, duration))
+        failed = failed or status != 'ok'
+    return results
+
+
+def print_report(results):
+    """Print the outcome of every step."""
+    print("%-16s %8s %8s %9s" % ('step', 'task', 'status', 'time'))
+    for name, result in results.items():
+        print("%-16s %8s %8s %8.1fs" % (
+            name, result['task_id'] or '-', result['status'],
+            result['duration']))
+        if result['error']:
+            print("    ERROR:", result['error'])
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Load the compiled field definitions when the application is created."""
+
+from __future__ import absolute_import
+
+
+def setup_app(app):
+    """Install compiled JSONAlchemy field definitions.
+
+    Set ``FIELDDEFS_PRELOAD`` to ``False`` to keep parsing them lazily and
+    ``FIELDDEFS_MARC_DISPATCH`` to ``False`` to keep the original MARC reader.
+    """
+    from cds.modules.fielddefs.api import load_field_definitions
+    from cds.modules.fielddefs.config import FIELDDEFS_MARC_DISPATCH, \
+        FIELDDEFS_NAMESPACES
+    from cds.modules.fielddefs.dispatch import install_marc_dispatch
+
+    if app.config.get('FIELDDEFS_MARC_DISPATCH', FIELDDEFS_MARC_DISPATCH):
+        install_marc_dispatch()
+    if app.config.get('FIELDDEFS_PRELOAD', True):
+        with app.app_context():
+            for namespace in FIELDDEFS_NAMESPACES:
+                load_field_definitions(namespace)
+    return app
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+
+"""Serve the knowledge base lookups from the compiled knowledge bases."""
+
+from __future__ import absolute_import
+
+
+def setup_app(app):
+    """Install the compiled lookups of the format elements.
+
+    Set ``KBCACHE_FORMATTER`` to ``False`` to keep the SQL lookups.
+    """
+    from cds.modules.kbcache.config import KBCACHE_FORMATTER
+    from cds.modules.kbcache.formatter import install_formatter_kb
+
+    if app.config.get('KBCACHE_FORMATTER', KBCACHE_FORMATTER):
+        install_formatter_kb()
+    return app
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+
+"""Hook the precomputed ranking data into the legacy ranking."""
+
+from __future__ import absolute_import
+
+
+def setup_app(app):
+    """Install the score vector dispatch of the legacy ranking.
+
+    Set ``RANKING_DISPATCH`` to ``False`` to keep the original rank
+    functions.
+    """
+    from cds.modules.ranking.config import RANKING_DISPATCH
+    from cds.modules.ranking.dispatch import install_rank_dispatch
+
+    if app.config.get('RANKING_DISPATCH', RANKING_DISPATCH):
+        install_rank_dispatch()
+    return app
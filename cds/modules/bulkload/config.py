@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Bulk loading configuration."""
+
+BULKLOAD_BATCH_SIZE = 1000
+"""Number of rows sent in one ``executemany`` call."""
+
+BULKLOAD_BUFFER_SIZE = 64 * 1024
+"""Number of characters read at once from a JSON source."""
+
+BULKLOAD_MIXER_MODULES = [
+    'cds.base.mixer.collection',
+    'cds.base.mixer.field_tag',
+    'cds.base.mixer.format',
+    'cds.base.mixer.index',
+]
+"""Modules defining the mixers whose sources are bulk loaded."""
+
+BULKLOAD_FIXTURE_MODULES = [
+    'cds.base.fixtures.bibknowledge',
+    'cds.base.fixtures.websubmit',
+]
+"""Fixture modules compiled by ``inveniomanage bulkload fixtures``."""
+
+BULKLOAD_CACHE_DIRNAME = 'bulkload'
+"""Directory, inside ``CFG_CACHEDIR``, holding the compiled fixtures."""
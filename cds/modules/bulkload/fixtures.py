@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Compiled fixtures.
+
+Large fixture modules define thousands of ``DataSet`` row classes and the
+``fixture`` library resolves their ``.ref()`` values and inserts them one row
+at a time.  :func:`compile_module` turns the data sets of a module into a
+columnar representation per table, with every reference already resolved,
+and caches it in a file named after the digest of the module source.
+:func:`load_compiled` then inserts each table with batched statements.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import imp
+import inspect
+import os
+import time
+
+from six.moves import cPickle
+
+from cds.utils import write_atomically
+
+from .config import BULKLOAD_BATCH_SIZE, BULKLOAD_CACHE_DIRNAME
+
+
+def _is_row(name, value):
+    return inspect.isclass(value) and not name.startswith('_') and \
+        name != 'Meta'
+
+
+def _row_values(row):
+    """Return the attributes of a row class, inherited ones included."""
+    return dict((name, getattr(row, name)) for name in dir(row)
+                if not name.startswith('_') and name != 'ref' and
+                not inspect.isclass(getattr(row, name)))
+
+
+def resolve(value):
+    """Return ``value`` with ``DataSet`` references replaced by values."""
+    from fixture.dataset import Ref
+    while isinstance(value, Ref.Value):
+        value = getattr(value.ref.row, value.attr_name)
+    return value
+
+
+def iter_datasets(module):
+    """Yield the ``DataSet`` classes defined in ``module``."""
+    from fixture import DataSet
+    for name, value in sorted(vars(module).items()):
+        if inspect.isclass(value) and issubclass(value, DataSet) and \
+                value is not DataSet and value.__module__ == module.__name__:
+            yield value
+
+
+def compile_datasets(datasets):
+    """Return the columnar representation of ``datasets``.
+
+    The model of ``FooData`` is the declarative model named ``Foo``.  Rows
+    are grouped by their set of columns, so that every group can be inserted
+    with one ``executemany``.
+
+    :return: dictionary ``{table name: [(columns, column values), ...]}``
+        where column values is a list with one list of values per column
+    """
+    from invenio.ext.sqlalchemy import db
+
+    registry = db.Model._decl_class_registry
+    tables = {}
+    for dataset in datasets:
+        model = registry[dataset.__name__[:-len('Data')]]
+        columns = set(model.__table__.columns.keys())
+        groups = {}
+        for name, row in sorted(vars(dataset).items()):
+            if not _is_row(name, row):
+                continue
+            values = dict((key, resolve(value)) for key, value
+                          in _row_values(row).items() if key in columns)
+            key = tuple(sorted(values))
+            group = groups.setdefault(key, [[] for _ in key])
+            for column, column_values in zip(key, group):
+                column_values.append(values[column])
+        tables.setdefault(model.__tablename__, []).extend(groups.items())
+    return tables
+
+
+def module_source(module_name):
+    """Return the source file of ``module_name`` without importing it."""
+    path = None
+    for part in module_name.split('.'):
+        f, path, _ = imp.find_module(part, path and [path])
+        if f is not None:
+            f.close()
+    return path
+
+
+def compiled_path(module_name, digest):
+    """Return the path of the compiled fixtures of a module."""
+    from invenio.config import CFG_CACHEDIR
+    return os.path.join(CFG_CACHEDIR, BULKLOAD_CACHE_DIRNAME,
+                        '%s-%s.pickle' % (module_name, digest))
+
+
+def compile_module(module_name):
+    """Return the compiled fixtures of ``module_name``, cached on disk.
+
+    The cache is keyed by the digest of the module source, so editing the
+    module invalidates it.  The module itself is only imported to compute
+    a missing cache.
+    """
+    from werkzeug.utils import import_string
+
+    with open(module_source(module_name), 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    path = compiled_path(module_name, digest)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return cPickle.load(f)
+
+    tables = compile_datasets(iter_datasets(import_string(module_name)))
+    write_atomically(path, lambda f: cPickle.dump(
+        tables, f, cPickle.HIGHEST_PROTOCOL))
+    return tables
+
+
+def load_compiled(module_names, batch_size=BULKLOAD_BATCH_SIZE,
+                  connection=None):
+    """Insert the compiled fixtures of ``module_names``.
+
+    Tables are loaded in foreign key order, each column group with batched
+    ``executemany`` calls.
+
+    :param connection: connection to use, a new transaction otherwise
+    :return: list of ``(table name, rows, seconds)``
+    """
+    from invenio.ext.sqlalchemy import db
+
+    tables = {}
+    for module_name in module_names:
+        for table_name, groups in compile_module(module_name).items():
+            tables.setdefault(table_name, []).extend(groups)
+
+    def load(connection):
+        stats = []
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            start = time.time()
+            count = 0
+            insert = table.insert()
+            for columns, values in tables[table.name]:
+                rows = [dict(zip(columns, row)) for row in zip(*values)]
+                for i in range(0, len(rows), batch_size):
+                    connection.execute(insert, rows[i:i + batch_size])
+                count += len(rows)
+            stats.append((table.name, count, time.time() - start))
+        return stats
+
+    if connection is not None:
+        return load(connection)
+    with db.engine.begin() as connection:
+        return load(connection)
+
+
+__all__ = ('compile_datasets', 'compile_module', 'iter_datasets',
+           'load_compiled', 'module_source', 'resolve', )
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Bulk load mixer sources and fixtures."""
+
+from __future__ import print_function
+
+from invenio.ext.script import Manager
+
+from .config import BULKLOAD_BATCH_SIZE, BULKLOAD_FIXTURE_MODULES
+
+manager = Manager(usage=__doc__)
+
+
+def print_stats(stats):
+    """Print rows and rows per second of every table."""
+    total_rows = total_time = 0
+    for table, rows, seconds in stats:
+        total_rows += rows
+        total_time += seconds
+        print("%-36s %8d rows %8.2fs %10.0f rows/s" % (
+            table, rows, seconds, rows / max(seconds, 1e-6)))
+    print("%-36s %8d rows %8.2fs %10.0f rows/s" % (
+        'total', total_rows, total_time, total_rows / max(total_time, 1e-6)))
+
+
+@manager.option('-b', '--batch-size', dest='batch_size', type=int,
+                default=BULKLOAD_BATCH_SIZE, help='rows per INSERT batch')
+@manager.option('-t', '--table', dest='tables', action='append',
+                default=None, help='load only this table (repeatable)')
+def mixer(tables=None, batch_size=BULKLOAD_BATCH_SIZE):
+    """Replace the mixer tables with the content of their sources."""
+    from .mixer import bulk_load
+    print(">>> Loading mixer sources...")
+    print_stats(bulk_load(tables, batch_size))
+
+
+@manager.option('-f', '--force', dest='force', action='store_true',
+                help='compare rows even if the source file did not change')
+@manager.option('-t', '--table', dest='tables', action='append',
+                default=None, help='sync only this table (repeatable)')
+def sync(tables=None, force=False):
+    """Apply the changes of the mixer sources to the database."""
+    from .sync import sync as sync_sources
+    print(">>> Synchronizing mixer sources...")
+    for table, inserted, updated, deleted in sync_sources(tables, force):
+        if inserted is None:
+            print("%-36s unchanged" % table)
+        else:
+            print("%-36s %6d inserted %6d updated %6d deleted" % (
+                table, inserted, updated, deleted))
+
+
+@manager.option('-b', '--batch-size', dest='batch_size', type=int,
+                default=BULKLOAD_BATCH_SIZE, help='rows per INSERT batch')
+@manager.option('-m', '--module', dest='modules', action='append',
+                default=None, help='fixture module (repeatable)')
+def fixtures(modules=None, batch_size=BULKLOAD_BATCH_SIZE):
+    """Load compiled fixtures into empty tables."""
+    from .fixtures import load_compiled
+    print(">>> Loading compiled fixtures...")
+    print_stats(load_compiled(modules or BULKLOAD_FIXTURE_MODULES,
+                              batch_size))
+
+
+@manager.option('-m', '--module', dest='modules', action='append',
+                default=None, help='fixture module (repeatable)')
+def benchmark_fixtures(modules=None):
+    """Compare the fixture library with the compiled fixtures.
+
+    The fixture tables must be empty.  Compiled rows are rolled back and
+    the rows loaded by the fixture library are torn down afterwards.
+    """
+    import time
+    from fixture import SQLAlchemyFixture
+    from werkzeug.utils import import_string
+    from invenio.ext.sqlalchemy import db
+    from .fixtures import compile_module, iter_datasets, load_compiled
+
+    modules = modules or BULKLOAD_FIXTURE_MODULES
+
+    start = time.time()
+    for module_name in modules:
+        compile_module(module_name)
+    print("compiled (from cache or source): %.2fs" % (time.time() - start))
+
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    start = time.time()
+    load_compiled(modules, connection=connection)
+    compiled = time.time() - start
+    transaction.rollback()
+    connection.close()
+
+    start = time.time()
+    datasets = [dataset for module_name in modules
+                for dataset in iter_datasets(import_string(module_name))]
+    registry = db.Model._decl_class_registry
+    env = dict((dataset.__name__, registry[dataset.__name__[:-len('Data')]])
+               for dataset in datasets)
+    data = SQLAlchemyFixture(env=env, engine=db.metadata.bind,
+                             session=db.session).data(*datasets)
+    data.setup()
+    library = time.time() - start
+    data.teardown()
+
+    print("fixture library: %.2fs" % library)
+    print("compiled load:   %.2fs" % compiled)
+    print("speed-up:        %.1fx" % (library / max(compiled, 1e-6)))
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
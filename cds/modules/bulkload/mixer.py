@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Bulk loading of the mixer JSON sources.
+
+Rows are streamed from ``sources/<table>.json`` and inserted with
+``executemany`` batches (which the MySQL driver turns into multi-row
+``INSERT`` statements), table after table in foreign key order, inside one
+transaction.
+"""
+
+from __future__ import absolute_import
+
+import time
+
+from .config import BULKLOAD_BATCH_SIZE
+from .sources import iter_json_array, iter_mixers
+
+
+def loaded_columns(model, fields):
+    """Return the names of the columns loaded from the sources."""
+    return set(fields or model.__table__.columns.keys())
+
+
+def iter_rows(model, fields, source):
+    """Yield the rows of ``source`` restricted to the loaded columns."""
+    columns = loaded_columns(model, fields)
+    for row in iter_json_array(source):
+        yield dict((key, value) for key, value in row.items()
+                   if key in columns)
+
+
+def insert_rows(connection, table, rows, batch_size=BULKLOAD_BATCH_SIZE):
+    """Insert ``rows`` into ``table`` in batches.
+
+    :return: number of inserted rows
+    """
+    insert = table.insert()
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            connection.execute(insert, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert, batch)
+        count += len(batch)
+    return count
+
+
+def bulk_load(tables=None, batch_size=BULKLOAD_BATCH_SIZE, replace=True):
+    """Load the mixer sources into the database.
+
+    :param tables: restrict to these table names
+    :param replace: delete the existing rows of the loaded tables first
+    :return: list of ``(table name, rows, seconds)``
+    """
+    from invenio.ext.sqlalchemy import db
+
+    mixers = iter_mixers(tables)
+    stats = []
+    with db.engine.begin() as connection:
+        if replace:
+            for model, _, _ in reversed(mixers):
+                connection.execute(model.__table__.delete())
+        for model, fields, source in mixers:
+            start = time.time()
+            rows = insert_rows(connection, model.__table__,
+                               iter_rows(model, fields, source), batch_size)
+            stats.append((model.__tablename__, rows, time.time() - start))
+    return stats
+
+
+__all__ = ('bulk_load', 'insert_rows', 'iter_rows', 'loaded_columns', )
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Bulk loading database models."""
+
+from invenio.ext.sqlalchemy import db
+
+
+class BulkloadSource(db.Model):
+
+    """Digest of the source file last synchronized into a table."""
+
+    __tablename__ = 'bulkloadSOURCE'
+
+    table_name = db.Column(db.String(100), primary_key=True, nullable=False)
+    digest = db.Column(db.String(40), nullable=False)
+    synchronized = db.Column(db.DateTime, nullable=False)
+
+
+__all__ = ('BulkloadSource', )
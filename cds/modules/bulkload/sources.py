@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Mixer sources discovery and streaming."""
+
+from __future__ import absolute_import
+
+import io
+import json
+import os
+
+from .config import BULKLOAD_BUFFER_SIZE, BULKLOAD_MIXER_MODULES
+
+
+def iter_json_array(path, buffer_size=BULKLOAD_BUFFER_SIZE):
+    """Yield the items of the JSON array stored in ``path`` one by one.
+
+    Only ``buffer_size`` characters plus the item being decoded are held in
+    memory.  An empty file is an empty array.
+    """
+    decoder = json.JSONDecoder()
+    with io.open(path, encoding='utf-8') as f:
+        buf, eof, expect = u'', False, '['
+        while True:
+            buf = buf.lstrip()
+            if not eof and len(buf) < buffer_size:
+                data = f.read(buffer_size)
+                eof = not data
+                buf = (buf + data).lstrip()
+            if not buf:
+                if eof and expect == '[':
+                    return
+                if eof:
+                    raise ValueError('%s: unterminated JSON array' % path)
+                continue
+            if expect == '[':
+                if buf[0] != '[':
+                    raise ValueError('%s: not a JSON array' % path)
+                buf, expect = buf[1:], 'first'
+            elif buf[0] == ']' and expect in ('first', 'separator'):
+                return
+            elif expect == 'separator':
+                if buf[0] != ',':
+                    raise ValueError('%s: malformed JSON array' % path)
+                buf, expect = buf[1:], 'value'
+            else:
+                try:
+                    value, end = decoder.raw_decode(buf)
+                except ValueError:
+                    if eof:
+                        raise
+                    data = f.read(buffer_size)
+                    eof = not data
+                    buf += data
+                    continue
+                yield value
+                buf, expect = buf[end:], 'separator'
+
+
+def iter_mixers(tables=None):
+    """Yield ``(model, fields, source)`` of the mixers in foreign key order.
+
+    :param tables: restrict to these table names
+    """
+    from invenio.ext.sqlalchemy import db
+    from werkzeug.utils import import_string
+
+    mixers = []
+    for name in BULKLOAD_MIXER_MODULES:
+        module = import_string(name)
+        directory = os.path.join(os.path.dirname(module.__file__), 'sources')
+        for mixer in (getattr(module, attr) for attr in module.__all__):
+            model = mixer.__model__
+            if tables and model.__tablename__ not in tables:
+                continue
+            mixers.append((model, getattr(mixer, '__fields__', None),
+                           os.path.join(directory,
+                                        model.__tablename__ + '.json')))
+    order = dict((table.name, position) for position, table
+                 in enumerate(db.metadata.sorted_tables))
+    mixers.sort(key=lambda mixer: order[mixer[0].__tablename__])
+    return mixers
+
+
+__all__ = ('iter_json_array', 'iter_mixers', )
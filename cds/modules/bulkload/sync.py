@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Incremental synchronization of the mixer sources.
+
+Instead of reloading every table, each source row is compared with the
+database row having the same primary key through a hash of its content and
+only the needed ``INSERT``, ``UPDATE`` and ``DELETE`` statements are issued.
+The digest of every synchronized source file is stored in
+:class:`~.models.BulkloadSource`, so unchanged files are skipped without
+being read.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import six
+
+from cds.utils import chunks
+
+from .config import BULKLOAD_BATCH_SIZE
+from .mixer import insert_rows, iter_rows, loaded_columns
+from .sources import iter_mixers
+
+
+def file_digest(path):
+    """Return the SHA1 digest of the content of ``path``."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def normalize_value(value, column_type):
+    """Return ``value`` of a column of ``column_type`` as canonical text.
+
+    Database rows and JSON sources hold different Python types for the same
+    value (``long`` and ``int``, ``datetime`` and its text, ``Decimal`` and
+    ``float``, ``bytes`` and text), so both are brought to the Python type
+    of the column before being written as text.
+    """
+    if value is None:
+        return None
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        python_type = None
+    if python_type in (datetime, date):
+        if isinstance(value, six.string_types):
+            return value.replace('T', ' ')
+        return value.strftime('%Y-%m-%d %H:%M:%S' if python_type is datetime
+                              else '%Y-%m-%d')
+    if python_type is bool:
+        return six.text_type(bool(value))
+    if python_type in six.integer_types:
+        return six.text_type(int(value))
+    if python_type in (float, Decimal):
+        return repr(float(value))
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return six.text_type(value)
+
+
+def row_hash(row, columns):
+    """Return a hash of the values of ``columns`` in ``row``.
+
+    :param columns: the :class:`~sqlalchemy.schema.Column` objects compared
+    """
+    values = [normalize_value(row.get(column.name), column.type)
+              for column in columns]
+    return hashlib.sha1(json.dumps(values).encode('utf-8')).hexdigest()
+
+
+def diff_table(connection, model, fields, source):
+    """Compare ``source`` with the content of the table of ``model``.
+
+    :return: ``(inserts, updates, deletes)`` lists of row dictionaries
+        (only primary keys for deletes)
+    """
+    table = model.__table__
+    columns = [table.c[c] for c in sorted(loaded_columns(model, fields))]
+    keys = [column.name for column in table.primary_key.columns]
+
+    stored = {}
+    query = table.select().with_only_columns(columns)
+    for row in connection.execute(query):
+        row = dict(zip([column.name for column in columns], row))
+        stored[tuple(row[key] for key in keys)] = row_hash(row, columns)
+
+    inserts, updates = [], []
+    seen = set()
+    for row in iter_rows(model, fields, source):
+        pk = tuple(row.get(key) for key in keys)
+        seen.add(pk)
+        current = stored.get(pk)
+        if current is None:
+            inserts.append(row)
+        elif current != row_hash(row, columns):
+            updates.append(row)
+    deletes = [dict(zip(keys, pk)) for pk in stored if pk not in seen]
+    return inserts, updates, deletes
+
+
+def _update(connection, table, rows, batch_size):
+    from invenio.ext.sqlalchemy import db
+
+    keys = [column.name for column in table.primary_key.columns]
+    # Source rows may omit columns, each column set gets its own statement.
+    groups = {}
+    for row in rows:
+        values = tuple(sorted(c for c in row if c not in keys))
+        groups.setdefault(values, []).append(row)
+    for values, group in groups.items():
+        statement = table.update().where(db.and_(*[
+            table.c[key] == db.bindparam('b_' + key) for key in keys
+        ])).values(dict((c, db.bindparam('b_' + c)) for c in values))
+        for batch in chunks(group, batch_size):
+            connection.execute(statement, [
+                dict(('b_' + key, value) for key, value in row.items())
+                for row in batch])
+
+
+def _delete(connection, table, rows, batch_size):
+    from invenio.ext.sqlalchemy import db
+
+    keys = [column.name for column in table.primary_key.columns]
+    statement = table.delete().where(db.and_(*[
+        table.c[key] == db.bindparam('b_' + key) for key in keys]))
+    for batch in chunks(rows, batch_size):
+        connection.execute(statement, [
+            dict(('b_' + key, value) for key, value in row.items())
+            for row in batch])
+
+
+def sync(tables=None, force=False, batch_size=BULKLOAD_BATCH_SIZE):
+    """Synchronize the mixer tables with their sources.
+
+    :param tables: restrict to these table names
+    :param force: compare the rows even if the source digest is unchanged
+    :return: list of ``(table name, inserted, updated, deleted)``, ``None``
+        counts for skipped tables
+    """
+    from invenio.ext.sqlalchemy import db
+    from .models import BulkloadSource
+
+    mixers = iter_mixers(tables)
+    stored = dict((source.table_name, source.digest)
+                  for source in BulkloadSource.query.all())
+    changes = []
+    with db.engine.begin() as connection:
+        for model, fields, source in mixers:
+            digest = file_digest(source)
+            if not force and stored.get(model.__tablename__) == digest:
+                changes.append((model, digest, None))
+            else:
+                changes.append((model, digest,
+                                diff_table(connection, model, fields,
+                                           source)))
+        # Deletes go children first, inserts and updates parents first.
+        for model, _, diff in reversed(changes):
+            if diff and diff[2]:
+                _delete(connection, model.__table__, diff[2], batch_size)
+        for model, _, diff in changes:
+            if diff:
+                insert_rows(connection, model.__table__, diff[0],
+                            batch_size)
+                if diff[1]:
+                    _update(connection, model.__table__, diff[1],
+                            batch_size)
+
+        now = datetime.now()
+        table = BulkloadSource.__table__
+        for model, digest, diff in changes:
+            if diff is None:
+                continue
+            connection.execute(table.delete().where(
+                table.c.table_name == model.__tablename__))
+            connection.execute(table.insert(), {
+                'table_name': model.__tablename__, 'digest': digest,
+                'synchronized': now})
+
+    return [(model.__tablename__, ) +
+            (tuple(len(rows) for rows in diff) if diff else
+             (None, None, None))
+            for model, _, diff in changes]
+
+
+__all__ = ('diff_table', 'file_digest', 'normalize_value', 'row_hash',
+           'sync', )
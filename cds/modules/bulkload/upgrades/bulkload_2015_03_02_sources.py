@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Create the table of the synchronized mixer sources."""
+
+from invenio.modules.upgrader.api import op
+from sqlalchemy import Column, DateTime, String
+
+depends_on = ['invenio_release_1_1_0']
+
+
+def info():
+    """Return upgrade recipe information."""
+    return "Create bulkloadSOURCE"
+
+
+def do_upgrade():
+    """Implement your upgrades here."""
+    if 'bulkloadSOURCE' not in op.get_bind().table_names():
+        op.create_table(
+            'bulkloadSOURCE',
+            Column('table_name', String(100), primary_key=True,
+                   nullable=False),
+            Column('digest', String(40), nullable=False),
+            Column('synchronized', DateTime, nullable=False),
+            mysql_charset='utf8',
+        )
+
+
+def estimate():
+    """Estimate running time of upgrade in seconds (optional)."""
+    return 1
+
+
+def pre_upgrade():
+    """Run pre-upgrade checks (optional)."""
+    pass
+
+
+def post_upgrade():
+    """Run post-upgrade checks (optional)."""
+    pass
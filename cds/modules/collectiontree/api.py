@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Process wide collection tree.
+
+The tree is built once per process, normally before the workers are forked
+(see :func:`warmup`), and refreshed incrementally: webcoll bumps a version
+in the cache after updating a collection, and processes seeing a new version
+reload the structure if it changed and only the reclists whose ``CRC32``
+changed.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+
+from cds.utils import chunks, placeholders
+
+from .config import COLLECTIONTREE_CHECK_INTERVAL, \
+    COLLECTIONTREE_LATEST_SIZE, COLLECTIONTREE_VERSION_KEY
+
+_tree = None
+_version = None
+_checked = 0
+_lock = threading.Lock()
+
+
+def _load_structure():
+    from invenio.legacy.dbquery import run_sql
+    return (run_sql('SELECT id, name FROM collection'),
+            run_sql('SELECT id_dad, id_son, type FROM collection_collection'))
+
+
+def _load_reclists(tree):
+    """Load the reclists that changed since ``tree`` was last updated.
+
+    :return: number of reloaded reclists
+    """
+    from intbitset import intbitset
+    from invenio.legacy.dbquery import run_sql
+
+    fingerprints = dict(run_sql('SELECT id, CRC32(reclist) FROM collection'))
+    changed = [id_ for id_, fingerprint in fingerprints.items()
+               if tree.fingerprints.get(id_, -1) != fingerprint]
+    reclists = {}
+    for chunk in chunks(changed, 100):
+        for id_, reclist in run_sql(
+                'SELECT id, reclist FROM collection WHERE id IN (%s)' %
+                placeholders(chunk), tuple(chunk)):
+            reclists[id_] = intbitset(reclist) if reclist else intbitset()
+    tree.update_reclists(reclists, dict((id_, fingerprints[id_])
+                                        for id_ in reclists))
+    return len(reclists)
+
+
+def _current_version():
+    from invenio.ext.cache import cache
+    return cache.get(COLLECTIONTREE_VERSION_KEY)
+
+
+def refresh_collection_tree():
+    """Bring the process tree up to date with the database.
+
+    :return: the tree
+    """
+    global _tree, _version, _checked
+    from .tree import CollectionTree
+
+    with _lock:
+        version = _current_version()
+        collections, relations = _load_structure()
+        tree = CollectionTree(collections, relations,
+                              COLLECTIONTREE_LATEST_SIZE)
+        if _tree is not None and _tree.structure == tree.structure:
+            tree = _tree
+        elif _tree is not None:
+            # Keep the reclists whose fingerprint will not change.
+            tree.update_reclists(
+                dict((id_, _tree.reclists[_tree.index[id_]])
+                     for id_ in tree.index if id_ in _tree.index),
+                _tree.fingerprints)
+        _load_reclists(tree)
+        _tree, _version, _checked = tree, version, time.time()
+    return _tree
+
+
+def get_collection_tree():
+    """Return the process tree, refreshed if webcoll updated collections."""
+    global _checked
+    if _tree is None:
+        return refresh_collection_tree()
+    if time.time() - _checked > COLLECTIONTREE_CHECK_INTERVAL:
+        _checked = time.time()
+        if _current_version() != _version:
+            return refresh_collection_tree()
+    return _tree
+
+
+def _find(collection):
+    """Return the tree containing ``collection`` or ``None``."""
+    tree = get_collection_tree()
+    if collection not in tree:
+        # The collection may have been created since the last refresh.
+        tree = refresh_collection_tree()
+    return tree if collection in tree else None
+
+
+def get_latest_records(collection, n=10):
+    """Return the ``n`` latest records of ``collection``, newest first.
+
+    Up to ``COLLECTIONTREE_LATEST_SIZE`` records are served from memory
+    without touching the reclist.
+    """
+    tree = _find(collection)
+    return tree.get_latest(collection, n) if tree is not None else ()
+
+
+def get_collection_size(collection):
+    """Return the number of records of ``collection``."""
+    tree = _find(collection)
+    return tree.get_size(collection) if tree is not None else 0
+
+
+def collection_updated(name=None):
+    """Announce that webcoll updated the reclist of collection ``name``."""
+    from invenio.ext.cache import cache
+    cache.set(COLLECTIONTREE_VERSION_KEY, time.time(), timeout=0)
+    if _tree is not None:
+        refresh_collection_tree()
+
+
+def warmup(app):
+    """Build the tree before the workers are forked."""
+    refresh_collection_tree()
+
+
+__all__ = ('collection_updated', 'get_collection_size',
+           'get_collection_tree', 'get_latest_records',
+           'refresh_collection_tree', 'warmup', )
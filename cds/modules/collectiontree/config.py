@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Collection tree configuration."""
+
+COLLECTIONTREE_CHECK_INTERVAL = 30
+"""Seconds between two checks of the tree version by a process."""
+
+COLLECTIONTREE_VERSION_KEY = 'collectiontree::version'
+"""Cache key bumped whenever webcoll updates a collection."""
+
+COLLECTIONTREE_LATEST_SIZE = 100
+"""Number of latest records kept in memory for every collection."""
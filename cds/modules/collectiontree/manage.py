@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Inspect the in-memory collection tree."""
+
+from __future__ import print_function
+
+from invenio.ext.script import Manager
+
+manager = Manager(usage=__doc__)
+
+
+@manager.option('collection', metavar='COLLECTION', nargs='?', default=None,
+                help='collection to describe')
+def show(collection=None):
+    """Print the size of the tree or the ancestry of a collection."""
+    from .api import refresh_collection_tree
+    tree = refresh_collection_tree()
+    if collection is None:
+        print(">>> %d collections, %d relations" % (
+            len(tree), len(tree.structure[1])))
+        return
+    print("ancestors:   %s" % ', '.join(tree.get_ancestors(collection)))
+    print("descendants: %s" % ', '.join(tree.get_descendants(collection)))
+    print("records:     %d (%d with descendants)" % (
+        len(tree.get_reclist(collection)),
+        len(tree.get_reclist(collection, descendants=True))))
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""In-memory collection tree.
+
+Collections get a dense index; every node keeps the sorted arrays of its
+ancestor and descendant indexes (a collection may have several parents, as
+virtual collections do) and its reclist as an :class:`intbitset`.  The
+union of the reclists of a node and all its descendants is precomputed, so
+testing whether a record belongs to a collection or any of its descendants
+is a single bit test.  The latest records of every collection are kept
+newest first, so a landing page does not walk a reclist to find them.
+"""
+
+from array import array
+from numbers import Integral
+
+from intbitset import intbitset
+
+
+class CollectionTree(object):
+
+    """Collections with precomputed ancestry and subtree reclists."""
+
+    def __init__(self, collections, relations, latest_size=100):
+        """Build the structure of the tree.
+
+        :param collections: iterable of ``(id, name)``
+        :param relations: iterable of ``(id_dad, id_son, type)``
+        :param latest_size: number of latest records kept per collection
+        """
+        self.latest_size = latest_size
+        self.structure = (tuple(sorted(collections)),
+                          tuple(sorted(relations)))
+        self.ids = array('i')
+        self.index = {}
+        self.names = []
+        self.name_index = {}
+        for i, (id_, name) in enumerate(self.structure[0]):
+            self.ids.append(id_)
+            self.index[id_] = i
+            self.names.append(name)
+            self.name_index[name] = i
+        size = len(self.ids)
+        parents = [set() for _ in range(size)]
+        self.children = [[] for _ in range(size)]
+        for id_dad, id_son, type_ in self.structure[1]:
+            if id_dad in self.index and id_son in self.index:
+                parents[self.index[id_son]].add(self.index[id_dad])
+                self.children[self.index[id_dad]].append(
+                    (self.index[id_son], type_))
+        self.ancestors = [self._closure(i, parents) for i in range(size)]
+        self.descendants = [
+            self._closure(i, [[child for child, _ in children]
+                              for children in self.children])
+            for i in range(size)]
+        self.reclists = [intbitset() for _ in range(size)]
+        self.subtrees = list(self.reclists)
+        self.sizes = array('i', [0] * size)
+        self.latest = [() for _ in range(size)]
+        self.fingerprints = {}
+
+    @staticmethod
+    def _closure(start, edges):
+        """Return the sorted array of nodes reachable from ``start``."""
+        seen = set()
+        stack = list(edges[start])
+        while stack:
+            node = stack.pop()
+            if node not in seen and node != start:
+                seen.add(node)
+                stack.extend(edges[node])
+        return array('i', sorted(seen))
+
+    def _node(self, collection):
+        """Return the index of a collection given by name or id."""
+        if isinstance(collection, Integral):
+            return self.index[collection]
+        return self.name_index[collection]
+
+    def __contains__(self, collection):
+        return collection in self.name_index or collection in self.index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def update_reclists(self, reclists, fingerprints=None):
+        """Replace the reclists of some collections.
+
+        Only the subtree unions of the updated collections and of their
+        ancestors are recomputed.
+
+        :param reclists: dictionary ``{collection id: intbitset}``
+        :param fingerprints: dictionary ``{collection id: fingerprint}`` of
+            the new reclists
+        """
+        dirty = set()
+        for id_, reclist in reclists.items():
+            if id_ not in self.index:
+                continue
+            node = self.index[id_]
+            self.reclists[node] = reclist
+            self.sizes[node] = len(reclist)
+            self.latest[node] = tuple(reversed(
+                reclist[-self.latest_size:])) if self.latest_size else ()
+            dirty.add(node)
+            dirty.update(self.ancestors[node])
+        # Children have fewer descendants than their parents, so their
+        # unions are up to date when the parents are computed.
+        for node in sorted(dirty,
+                           key=lambda node: len(self.descendants[node])):
+            if self.children[node]:
+                subtree = intbitset(self.reclists[node])
+                for child, _ in self.children[node]:
+                    subtree |= self.subtrees[child]
+                self.subtrees[node] = subtree
+            else:
+                self.subtrees[node] = self.reclists[node]
+        self.fingerprints.update(fingerprints or {})
+
+    def contains(self, collection, recid, descendants=True):
+        """Return whether ``recid`` belongs to ``collection``.
+
+        :param descendants: also look into the descendants of the collection
+        """
+        node = self._node(collection)
+        if descendants:
+            return recid in self.subtrees[node]
+        return recid in self.reclists[node]
+
+    def get_reclist(self, collection, descendants=False):
+        """Return the reclist of ``collection`` (do not modify it)."""
+        node = self._node(collection)
+        return self.subtrees[node] if descendants else self.reclists[node]
+
+    def get_size(self, collection):
+        """Return the number of records of ``collection``."""
+        return self.sizes[self._node(collection)]
+
+    def get_latest(self, collection, n=10):
+        """Return the ``n`` latest records of ``collection``, newest first."""
+        node = self._node(collection)
+        if n <= self.latest_size:
+            return self.latest[node][:n]
+        return tuple(reversed(self.reclists[node][-n:]))
+
+    def get_ancestors(self, collection):
+        """Return the names of the ancestors of ``collection``."""
+        return [self.names[i] for i in self.ancestors[self._node(collection)]]
+
+    def get_descendants(self, collection):
+        """Return the names of the descendants of ``collection``."""
+        return [self.names[i]
+                for i in self.descendants[self._node(collection)]]
+
+    def get_children(self, collection, type_=None):
+        """Return the names of the children of ``collection``.
+
+        :param type_: ``'r'`` (regular) or ``'v'`` (virtual), both if
+            ``None``
+        """
+        return [self.names[child]
+                for child, child_type in self.children[self._node(collection)]
+                if type_ is None or child_type == type_]
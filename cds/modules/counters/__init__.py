@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Record counters (comments, reviews, copies and citations)."""
+
+from __future__ import absolute_import
+
+from sqlalchemy import event
+
+from invenio.modules.circulation.models import CrcITEM
+from invenio.modules.comments.models import CmtRECORDCOMMENT
+
+from .receivers import comment_changed, item_changed
+from .triggers import register_triggers
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(CmtRECORDCOMMENT, _event, comment_changed)
+    event.listen(CrcITEM, _event, item_changed)
+
+register_triggers({'cmtRECORDCOMMENT': CmtRECORDCOMMENT.__table__,
+                   'crcITEM': CrcITEM.__table__})
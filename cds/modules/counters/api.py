@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Record counters API.
+
+The calculated fields ``number_of_comments``, ``number_of_reviews``,
+``number_of_copies`` and ``cited_by_count`` are read from the
+``record_counters`` table (see :class:`~.models.RecordCounters`).  Rows are
+kept up to date by database triggers on the comment and circulation tables
+(see :mod:`.triggers`), which fire for the plain SQL writes of legacy
+webcomment and bibcirculation as well as for the ORM, and by
+:func:`refresh_citation_counters` after each run of the citation indexer.
+A popular record therefore never runs ``COUNT(*)`` on a read.
+
+Reads never write: a record missing from the table is counted with the
+grouped queries of :data:`COUNTERS` and only cached.  Values are kept in
+the cache for ``COUNTERS_CACHE_TIMEOUT`` seconds, which bounds how late a
+write shows up.
+"""
+
+from __future__ import absolute_import
+
+from cds.utils import chunks, placeholders
+
+from .config import COUNTERS_BULK_CHUNK_SIZE, COUNTERS_CACHE_TIMEOUT, \
+    COUNTERS_QUERY_TIMEOUT
+
+COUNTERS = {
+    'number_of_comments': ('cmtRECORDCOMMENT', 'id_bibrec', 'star_score=0'),
+    'number_of_reviews': ('cmtRECORDCOMMENT', 'id_bibrec', 'star_score>0'),
+    'number_of_copies': ('crcITEM', 'id_bibrec', None),
+    'cited_by_count': ('rnkCITATIONDICT', 'citee', None),
+}
+"""Source table, record column and condition of each counter."""
+
+CITATIONS_WATERMARK = 'cited_by_count'
+"""``rnkWATERMARK`` method of :func:`refresh_citation_counters`."""
+
+
+def _cache_key(name, recid):
+    return 'counters::%s::%s' % (name, recid)
+
+
+def _count_query(name, recids):
+    table, column, condition = COUNTERS[name]
+    where = ['%s IN (%s)' % (column, placeholders(recids))]
+    if condition:
+        where.append(condition)
+    return ('SELECT /*+ MAX_EXECUTION_TIME(%d) */ %s, COUNT(*) FROM %s '
+            'WHERE %s GROUP BY %s' % (COUNTERS_QUERY_TIMEOUT, column, table,
+                                      ' AND '.join(where), column))
+
+
+def _check_names(names):
+    """Refuse counter names that would be interpolated into SQL unchecked."""
+    unknown = set(names) - set(COUNTERS)
+    if unknown:
+        raise ValueError('Unknown counters: %s' % ', '.join(sorted(unknown)))
+
+
+def _normalize(recids):
+    return sorted(set(int(recid) for recid in recids if recid))
+
+
+def get_counter_bulk(name, recids):
+    """Compute the counter ``name`` for all ``recids`` from its source.
+
+    :param name: one of the keys of :data:`COUNTERS`
+    :param recids: iterable of record identifiers
+    :return: dictionary ``{recid: value}``, records without rows count 0
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    _check_names([name])
+    recids = _normalize(recids)
+    values = dict.fromkeys(recids, 0)
+    for chunk in chunks(recids, COUNTERS_BULK_CHUNK_SIZE):
+        values.update(run_sql(_count_query(name, chunk), tuple(chunk)))
+    return values
+
+
+def read_counters(recids, names=None):
+    """Read stored counters of ``recids`` from ``record_counters``.
+
+    :return: dictionary ``{recid: {name: value}}`` containing only the
+        records present in the table
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    names = sorted(names or COUNTERS)
+    _check_names(names)
+    recids = _normalize(recids)
+    stored = {}
+    for chunk in chunks(recids, COUNTERS_BULK_CHUNK_SIZE):
+        for row in run_sql(
+                'SELECT id_bibrec, %s FROM record_counters '
+                'WHERE id_bibrec IN (%s)' % (', '.join(names),
+                                             placeholders(chunk)),
+                tuple(chunk)):
+            stored[row[0]] = dict(zip(names, row[1:]))
+    return stored
+
+
+def store_counters(values):
+    """Insert or update rows of ``record_counters``.
+
+    A row inserted with only some of the counters gets 0 for the others, so
+    partial values must only be stored for records already in the table.
+    ``last_updated`` records when every counter of a row was last computed
+    and is only moved when all of them are stored.
+
+    :param values: dictionary ``{recid: {name: value}}``
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    by_names = {}
+    for recid, counters in values.items():
+        by_names.setdefault(tuple(sorted(counters)), []).append(
+            (recid, counters))
+    for names, rows in by_names.items():
+        _check_names(names)
+        updates = ['%s=VALUES(%s)' % (name, name) for name in names]
+        if set(names) == set(COUNTERS):
+            updates.append('last_updated=NOW()')
+        row_placeholders = '(%s, NOW())' % ', '.join(
+            ['%s'] * (len(names) + 1))
+        for chunk in chunks(rows, COUNTERS_BULK_CHUNK_SIZE):
+            params = []
+            for recid, counters in chunk:
+                params.append(recid)
+                params.extend(counters[name] for name in names)
+            run_sql(
+                'INSERT INTO record_counters (id_bibrec, %s, last_updated) '
+                'VALUES %s ON DUPLICATE KEY UPDATE %s' % (
+                    ', '.join(names),
+                    ', '.join([row_placeholders] * len(chunk)),
+                    ', '.join(updates)),
+                tuple(params))
+
+
+def _fill_cache(values):
+    from invenio.ext.cache import cache
+
+    by_name = {}
+    for recid, counters in values.items():
+        for name, value in counters.items():
+            by_name.setdefault(name, {})[_cache_key(name, recid)] = value
+    for name, mapping in by_name.items():
+        cache.set_many(mapping, timeout=COUNTERS_CACHE_TIMEOUT[name])
+
+
+def compute_counters(recids, names=None):
+    """Count counters of ``recids`` from their sources without storing them.
+
+    :return: dictionary ``{recid: {name: value}}``
+    """
+    recids = _normalize(recids)
+    values = dict((recid, {}) for recid in recids)
+    for name in names or COUNTERS:
+        for recid, value in get_counter_bulk(name, recids).items():
+            values[recid][name] = value
+    return values
+
+
+def refresh_counters(recids, names=None):
+    """Recompute counters of ``recids`` from their sources and store them.
+
+    :return: dictionary ``{recid: {name: value}}``
+    """
+    values = compute_counters(recids, names)
+    store_counters(values)
+    _fill_cache(values)
+    return values
+
+
+def prefetch_counters(recids, names=None):
+    """Load counters of ``recids`` and fill the cache with them.
+
+    Stored values are read with one query, records missing from
+    ``record_counters`` are counted with one grouped query per counter.
+    Nothing is written to the database.
+
+    :param recids: iterable of record identifiers
+    :param names: counters to load, all of :data:`COUNTERS` by default
+    :return: dictionary ``{name: {recid: value}}``
+    """
+    names = list(names or COUNTERS)
+    recids = _normalize(recids)
+    values = read_counters(recids, names)
+    missing = [recid for recid in recids if recid not in values]
+    if missing:
+        values.update(compute_counters(missing, names))
+    _fill_cache(values)
+    result = dict((name, {}) for name in names)
+    for recid, counters in values.items():
+        for name in names:
+            result[name][recid] = counters[name]
+    return result
+
+
+def get_cached_counter(name, recid):
+    """Return the cached value of counter ``name`` or ``None``."""
+    from invenio.ext.cache import cache
+    return cache.get(_cache_key(name, recid))
+
+
+def get_counter(name, recid):
+    """Return counter ``name`` of ``recid``.
+
+    The value is looked up in the cache, then in ``record_counters``.  Only
+    a record missing from the table is counted from the source.
+    """
+    value = get_cached_counter(name, recid)
+    if value is not None:
+        return value
+    recid = int(recid)
+    values = read_counters([recid], [name])
+    if recid not in values:
+        values = compute_counters([recid], [name])
+    _fill_cache(values)
+    return values[recid][name]
+
+
+def invalidate_cached_counter(name, recid):
+    """Remove counter ``name`` of ``recid`` from the cache."""
+    from invenio.ext.cache import cache
+    cache.delete(_cache_key(name, recid))
+
+
+def rebuild_counters(chunk_size=COUNTERS_BULK_CHUNK_SIZE):
+    """Recompute the counters of every record.
+
+    :return: number of records processed
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    recids = [row[0] for row in run_sql('SELECT id FROM bibrec ORDER BY id')]
+    for chunk in chunks(recids, chunk_size):
+        refresh_counters(chunk)
+    return len(recids)
+
+
+def check_counters(fix=False, chunk_size=COUNTERS_BULK_CHUNK_SIZE):
+    """Compare ``record_counters`` with the source tables.
+
+    :param fix: store the correct value of every inconsistent counter
+    :return: list of ``(recid, name, stored, actual)`` tuples
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    recids = [row[0] for row in run_sql(
+        'SELECT id_bibrec FROM record_counters ORDER BY id_bibrec')]
+    mismatches = []
+    for chunk in chunks(recids, chunk_size):
+        stored = read_counters(chunk)
+        for name in COUNTERS:
+            for recid, actual in get_counter_bulk(name, chunk).items():
+                if stored[recid][name] != actual:
+                    mismatches.append((recid, name, stored[recid][name],
+                                       actual))
+    if fix and mismatches:
+        refresh_counters(set(recid for recid, _, _, _ in mismatches))
+    return mismatches
+
+
+def refresh_citation_counters(since=None):
+    """Refresh ``cited_by_count`` of records cited since ``since``.
+
+    It is meant to run after the citation indexer, which writes the
+    citation dictionary directly.  Records missing from the table are left
+    alone, they are counted on their next read.
+
+    :param since: ``datetime`` of the previous refresh, by default the
+        watermark stored by the previous call (all records the first time)
+    :return: number of records refreshed
+    """
+    from invenio.legacy.dbquery import run_sql
+    from cds.modules.ranking.term_count import get_watermark, set_watermark
+
+    started = run_sql('SELECT NOW()')[0][0]
+    if since is None:
+        since = get_watermark(CITATIONS_WATERMARK)
+    if since is None:
+        recids = [row[0] for row in run_sql(
+            'SELECT DISTINCT c.citee FROM rnkCITATIONDICT AS c '
+            'JOIN record_counters AS r ON r.id_bibrec=c.citee')]
+    else:
+        recids = [row[0] for row in run_sql(
+            'SELECT DISTINCT c.citee FROM rnkCITATIONDICT AS c '
+            'JOIN record_counters AS r ON r.id_bibrec=c.citee '
+            'WHERE c.last_updated>=%s', (since, ))]
+    for chunk in chunks(recids, COUNTERS_BULK_CHUNK_SIZE):
+        refresh_counters(chunk, ['cited_by_count'])
+    set_watermark(CITATIONS_WATERMARK, started)
+    return len(recids)
+
+
+__all__ = ('CITATIONS_WATERMARK', 'COUNTERS', 'check_counters',
+           'compute_counters', 'get_cached_counter', 'get_counter',
+           'get_counter_bulk', 'invalidate_cached_counter',
+           'prefetch_counters', 'read_counters', 'rebuild_counters',
+           'refresh_citation_counters', 'refresh_counters',
+           'store_counters', )
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Citation counts of all records in one array.
+
+The citation dictionary is counted once per run of the citation indexer
+into a dense array of little-endian uint32 indexed by recid, written next
+to a small JSON file recording its version (the ``last_updated`` of the
+``citation`` rank method it was built from).  Processes map the array
+read-only and remap it when it is rebuilt, so ``cited_by_count`` and result
+pages read citation counts without a query.  An array built before the last
+run of the citation indexer is not used, counts are then read from
+``record_counters`` until ``inveniomanage counters refresh_citations``
+rebuilds it.
+"""
+
+from __future__ import absolute_import
+
+import json
+import os
+import struct
+from array import array
+from datetime import datetime
+
+from cds.utils import MappedFile, MappedFiles, write_atomically
+
+from .config import COUNTERS_CITATIONS_CHECK_INTERVAL, \
+    COUNTERS_CITATIONS_DIRNAME
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def array_path():
+    """Return the path of the citation count array."""
+    from invenio.config import CFG_CACHEDIR
+    return os.path.join(CFG_CACHEDIR, COUNTERS_CITATIONS_DIRNAME,
+                        'citations.u32')
+
+
+def _info_path():
+    return array_path()[:-len('.u32')] + '.json'
+
+
+def get_indexer_version():
+    """Return when the citation indexer last finished, or ``None``."""
+    from invenio.legacy.dbquery import run_sql
+    res = run_sql("SELECT last_updated FROM rnkMETHOD WHERE name='citation'")
+    return res[0][0] if res else None
+
+
+def _format_version(version):
+    return version.strftime(DATE_FORMAT) if version else None
+
+
+def _read_info():
+    try:
+        with open(_info_path(), 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+    except (IOError, OSError, ValueError):
+        return dict(version=None, built=None, records=0)
+
+
+def build_citation_counts():
+    """Count the citation dictionary and replace the array.
+
+    :return: information of the new array, see :func:`get_citation_info`
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    version = get_indexer_version()
+    counts = dict(run_sql(
+        'SELECT citee, COUNT(*) FROM rnkCITATIONDICT GROUP BY citee'))
+    vector = array('I', [0]) * (max(counts) + 1 if counts else 0)
+    for recid, count in counts.items():
+        vector[recid] = count
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        vector.byteswap()
+    write_atomically(array_path(), vector.tofile)
+    # The info names the array it describes, a process mapping the new
+    # array before the info is replaced does not take the old version.
+    stat = os.stat(array_path())
+    info = dict(version=_format_version(version),
+                built=datetime.now().strftime(DATE_FORMAT),
+                records=len(counts), array=[stat.st_ino, stat.st_mtime])
+    write_atomically(_info_path(),
+                     lambda f: f.write(json.dumps(info).encode('utf-8')))
+    return get_citation_info()
+
+
+class CitationCounts(MappedFile):
+
+    """Read-only mapping of the citation count array."""
+
+    def __init__(self, path):
+        super(CitationCounts, self).__init__(path)
+        self.size = self.length // 4
+        self.version = None
+        self.stale = True
+
+    def check(self):
+        """Mark the array stale if the indexer ran since it was built.
+
+        The version is only taken from an info file describing this very
+        array, an array without one is stale.
+        """
+        info = _read_info()
+        self.version = info['version'] \
+            if info.get('array') == list(self.identity) else None
+        self.stale = self.version is None or \
+            self.version != _format_version(get_indexer_version())
+
+    def get(self, recid):
+        """Return the number of records citing ``recid``."""
+        recid = int(recid)
+        if not 0 <= recid < self.size:
+            return 0
+        return struct.unpack_from('<I', self._mmap, recid * 4)[0]
+
+    def get_many(self, recids):
+        """Return ``{recid: count}`` of ``recids``."""
+        return dict((int(recid), self.get(recid)) for recid in recids)
+
+
+_counts = MappedFiles(CitationCounts, COUNTERS_CITATIONS_CHECK_INTERVAL)
+
+
+def get_citation_counts():
+    """Return the mapped array, or ``None`` if it was never built or is stale.
+
+    The file and the last run of the indexer are checked at most every
+    ``COUNTERS_CITATIONS_CHECK_INTERVAL`` seconds.
+    """
+    counts = _counts.get(array_path())
+    return None if counts is None or counts.stale else counts
+
+
+def get_citation_count(recid):
+    """Return the citation count of ``recid`` or ``None`` without array.
+
+    ``None`` is also returned while the array is stale.
+    """
+    counts = get_citation_counts()
+    return counts.get(recid) if counts is not None else None
+
+
+def get_citation_counts_bulk(recids):
+    """Return ``{recid: count}`` of ``recids`` for a result page.
+
+    Records are counted from ``record_counters`` if the array was never
+    built or is stale.
+    """
+    counts = get_citation_counts()
+    if counts is not None:
+        return counts.get_many(recids)
+    from .api import prefetch_counters
+    return prefetch_counters(recids, ['cited_by_count'])['cited_by_count']
+
+
+def get_citation_info():
+    """Return the version and staleness of the citation count array.
+
+    :return: dictionary with the indexer run the array was built from
+        (``version``), when it was ``built``, the number of cited
+        ``records``, the last run of the indexer (``indexer_version``) and
+        whether the array is ``stale``
+    """
+    info = _read_info()
+    info['indexer_version'] = _format_version(get_indexer_version())
+    info['stale'] = info['built'] is None or \
+        info['version'] != info['indexer_version']
+    return info
+
+
+def warmup(app):
+    """Map the array before the workers are forked."""
+    get_citation_counts()
+
+
+__all__ = ('CitationCounts', 'array_path', 'build_citation_counts',
+           'get_citation_count', 'get_citation_counts',
+           'get_citation_counts_bulk', 'get_citation_info',
+           'get_indexer_version', 'warmup', )
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Record counters configuration."""
+
+COUNTERS_CACHE_TIMEOUT = {
+    'number_of_comments': 30,
+    'number_of_reviews': 300,
+    'number_of_copies': 300,
+    'cited_by_count': 300,
+}
+"""Seconds a counter value stays in the cache, per calculated field."""
+
+COUNTERS_BULK_CHUNK_SIZE = 1000
+"""Maximum number of record identifiers sent in one ``IN (...)`` clause."""
+
+COUNTERS_QUERY_TIMEOUT = 2000
+"""Milliseconds after which the database aborts a counter query."""
+
+COUNTERS_COPIES_LRU_SIZE = 10000
+"""Number of records whose copies are kept in memory by each process."""
+
+COUNTERS_COPIES_LRU_TTL = 60
+"""Seconds a number of copies stays in memory."""
+
+COUNTERS_CITATIONS_DIRNAME = 'counters'
+"""Directory, inside ``CFG_CACHEDIR``, holding the citation count array."""
+
+COUNTERS_CITATIONS_CHECK_INTERVAL = 30
+"""Seconds between two checks for a rebuilt citation count array."""
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Number of circulation copies of records.
+
+Lookups go through a bounded in-process LRU, then through the stored
+counters of :mod:`.api`.  Failures raise :exc:`.errors.CounterLookupTimeout`
+or :exc:`.errors.CounterLookupError` instead of returning a value, so they are
+never cached as an answer.
+
+Entries are dropped by :func:`invalidate_copies`, which is only called by the
+receivers of circulation items written through the ORM.  The stored row is
+updated by a trigger for every write, but copies added or removed by legacy
+bibcirculation with plain SQL are only seen once the entry expires after
+``COUNTERS_COPIES_LRU_TTL`` seconds and the cached counter after its
+``COUNTERS_CACHE_TIMEOUT``.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .api import get_counter, prefetch_counters
+from .config import COUNTERS_COPIES_LRU_SIZE, COUNTERS_COPIES_LRU_TTL
+from .errors import CounterLookupError, CounterLookupTimeout
+
+TIMEOUT_ERROR_CODES = (1317, 2013, 3024)
+"""MySQL errors raised when a query is interrupted or runs out of time."""
+
+
+class LRUCache(object):
+
+    """Thread safe least recently used cache with expiring entries."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value of ``key`` or ``None``."""
+        with self._lock:
+            try:
+                value, expires = self._data.pop(key)
+            except KeyError:
+                return None
+            if expires < time.time():
+                return None
+            self._data[key] = (value, expires)
+            return value
+
+    def set(self, key, value):
+        """Store ``value`` evicting the least recently used entry."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, time.time() + self.ttl)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove ``key`` from the cache."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+copies_cache = LRUCache(COUNTERS_COPIES_LRU_SIZE, COUNTERS_COPIES_LRU_TTL)
+
+
+@contextmanager
+def _lookup_errors():
+    """Translate database errors into counter lookup errors."""
+    from MySQLdb import Error as MySQLError
+    from sqlalchemy.exc import DBAPIError
+    try:
+        yield
+    except (DBAPIError, MySQLError) as e:
+        error = getattr(e, 'orig', e)
+        if error.args and error.args[0] in TIMEOUT_ERROR_CODES:
+            raise CounterLookupTimeout(str(e))
+        raise CounterLookupError(str(e))
+
+
+def get_number_of_copies(recid):
+    """Return the number of circulation copies of ``recid``.
+
+    :raises CounterLookupTimeout: the query took too long
+    :raises CounterLookupError: the database failed
+    """
+    recid = int(recid)
+    value = copies_cache.get(recid)
+    if value is None:
+        with _lookup_errors():
+            value = get_counter('number_of_copies', recid)
+        copies_cache.set(recid, value)
+    return value
+
+
+def get_number_of_copies_bulk(recids):
+    """Return ``{recid: number of copies}`` for all ``recids``.
+
+    Records not in memory are loaded with one query (plus one grouped query
+    for records whose counters were never computed).
+
+    :raises CounterLookupTimeout: the query took too long
+    :raises CounterLookupError: the database failed
+    """
+    values = {}
+    missing = []
+    for recid in set(int(recid) for recid in recids if recid):
+        value = copies_cache.get(recid)
+        if value is None:
+            missing.append(recid)
+        else:
+            values[recid] = value
+    if missing:
+        with _lookup_errors():
+            loaded = prefetch_counters(missing, ['number_of_copies'])
+        for recid, value in loaded['number_of_copies'].items():
+            copies_cache.set(recid, value)
+            values[recid] = value
+    return values
+
+
+def invalidate_copies(recid):
+    """Forget the number of copies of ``recid`` held in memory."""
+    copies_cache.delete(int(recid))
+
+
+def ensure_copies_index():
+    """Create the index on ``crcITEM.id_bibrec`` unless it exists.
+
+    :return: ``True`` if the index was created
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    if run_sql("SHOW INDEX FROM crcITEM WHERE Column_name='id_bibrec' "
+               "AND Seq_in_index=1"):
+        return False
+    run_sql("CREATE INDEX id_bibrec ON crcITEM (id_bibrec)")
+    return True
+
+
+__all__ = ('LRUCache', 'copies_cache', 'ensure_copies_index',
+           'get_number_of_copies', 'get_number_of_copies_bulk',
+           'invalidate_copies', )
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Maintain the record counters table."""
+
+from __future__ import print_function
+
+import sys
+from datetime import datetime
+
+from invenio.ext.script import Manager
+
+manager = Manager(usage=__doc__)
+
+
+@manager.option('--chunk-size', dest='chunk_size', type=int, default=1000,
+                help='number of records computed together')
+def rebuild(chunk_size=1000):
+    """Recompute the counters of every record."""
+    from .api import rebuild_counters
+    from .copies import ensure_copies_index
+    ensure_copies_index()
+    print(">>> Rebuilding record counters...")
+    print(">>> %d records processed." % rebuild_counters(chunk_size))
+
+
+@manager.command
+def ensure_index():
+    """Create the index on crcITEM.id_bibrec unless it exists."""
+    from .copies import ensure_copies_index
+    if ensure_copies_index():
+        print(">>> Index on crcITEM.id_bibrec created.")
+    else:
+        print(">>> Index on crcITEM.id_bibrec already exists.")
+
+
+@manager.option('--drop', action='store_true', dest='drop',
+                help='remove the triggers instead')
+def triggers(drop=False):
+    """Create the triggers maintaining the counters."""
+    from .triggers import create_triggers, drop_triggers
+    if drop:
+        drop_triggers()
+        print(">>> Record counters triggers removed.")
+    else:
+        create_triggers()
+        print(">>> Record counters triggers created.")
+
+
+@manager.option('--fix', action='store_true', dest='fix',
+                help='store the correct values')
+def check(fix=False):
+    """Compare stored counters with their source tables."""
+    from .api import check_counters
+    mismatches = check_counters(fix=fix)
+    for recid, name, stored, actual in mismatches:
+        print("%s of record %d is %s instead of %s" % (name, recid, stored,
+                                                       actual))
+    if mismatches and not fix:
+        print(">>> %d inconsistent counters found." % len(mismatches))
+        sys.exit(1)
+    print(">>> Record counters are consistent.")
+
+
+@manager.option('--since', dest='since', default=None,
+                help='date of the previous run (YYYY-MM-DD HH:MM:SS), '
+                     'by default the end of the previous refresh')
+def refresh_citations(since=None):
+    """Refresh citation counts changed by the citation indexer."""
+    from .api import refresh_citation_counters
+    from .citations import build_citation_counts
+    if since is not None:
+        since = datetime.strptime(since, '%Y-%m-%d %H:%M:%S')
+    print(">>> %d citation counters refreshed." %
+          refresh_citation_counters(since))
+    print_citation_info(build_citation_counts())
+
+
+def print_citation_info(info):
+    """Print the version and staleness of the citation count array."""
+    print(">>> Citation count array: %d cited records, built %s from the "
+          "citation indexer run of %s (last run %s)%s" % (
+              info['records'], info['built'], info['version'],
+              info['indexer_version'], ', stale' if info['stale'] else ''))
+
+
+@manager.option('--build', dest='build', action='store_true',
+                help='rebuild the array from the citation dictionary')
+def citations(build=False):
+    """Show (or rebuild) the citation count array."""
+    from .citations import build_citation_counts, get_citation_info
+    print_citation_info(build_citation_counts() if build
+                        else get_citation_info())
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Record counters database models."""
+
+from invenio.ext.sqlalchemy import db
+from invenio.modules.records.models import Record as Bibrec
+
+
+class RecordCounters(db.Model):
+
+    """Denormalized counters of a record.
+
+    The rows are kept up to date by the database triggers of
+    :mod:`.triggers` and can be rebuilt at any time with ``inveniomanage
+    counters rebuild``.  ``last_updated`` is when every counter of the row
+    was last computed together.
+    """
+
+    __tablename__ = 'record_counters'
+
+    id_bibrec = db.Column(db.MediumInteger(8, unsigned=True),
+                          db.ForeignKey(Bibrec.id), primary_key=True,
+                          nullable=False)
+    number_of_comments = db.Column(db.Integer(15, unsigned=True),
+                                   nullable=False, server_default='0')
+    number_of_reviews = db.Column(db.Integer(15, unsigned=True),
+                                  nullable=False, server_default='0')
+    number_of_copies = db.Column(db.Integer(15, unsigned=True),
+                                 nullable=False, server_default='0')
+    cited_by_count = db.Column(db.Integer(15, unsigned=True),
+                               nullable=False, server_default='0')
+    last_updated = db.Column(db.DateTime, nullable=False,
+                             server_default='1900-01-01 00:00:00')
+
+
+__all__ = ('RecordCounters', )
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Cache invalidation of the record counters.
+
+The stored counters are maintained by the database triggers of
+:mod:`.triggers`.  Comments and circulation items written through the ORM
+additionally drop the cached values of their record, so the change shows
+up at once; plain SQL writes of legacy webcomment and bibcirculation show
+up when the cached values expire.
+"""
+
+from __future__ import absolute_import
+
+from .api import invalidate_cached_counter
+from .copies import invalidate_copies
+
+
+def comment_changed(mapper, connection, target):
+    """Forget the cached comment and review counts of the record."""
+    invalidate_cached_counter('number_of_comments', target.id_bibrec)
+    invalidate_cached_counter('number_of_reviews', target.id_bibrec)
+
+
+def item_changed(mapper, connection, target):
+    """Forget the cached number of copies of the record."""
+    invalidate_cached_counter('number_of_copies', target.id_bibrec)
+    invalidate_copies(target.id_bibrec)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Database triggers maintaining ``record_counters``.
+
+Legacy webcomment and bibcirculation write comments and circulation items
+with plain SQL, so the counters are maintained by triggers on the source
+tables rather than by ORM events.  Every insert, update or delete of a
+comment or an item recomputes the counters of the same source for the
+record concerned, with one indexed ``COUNT(*)`` each; a record without a
+row gets one with all its counters.  Citations are written in bulk by the
+citation indexer and are refreshed by :func:`.api.refresh_citation_counters`
+instead.
+"""
+
+from __future__ import absolute_import
+
+from .api import COUNTERS
+
+TRIGGER_TABLES = ('cmtRECORDCOMMENT', 'crcITEM')
+"""Source tables whose writes update ``record_counters``."""
+
+EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def trigger_name(table, event):
+    """Return the name of the trigger of ``table`` on ``event``."""
+    return 'record_counters_%s_%s' % (table.lower(), event.lower())
+
+
+def _count_sql(name, recid):
+    table, column, condition = COUNTERS[name]
+    where = '%s=%s' % (column, recid)
+    if condition:
+        where += ' AND ' + condition
+    return '(SELECT COUNT(*) FROM %s WHERE %s)' % (table, where)
+
+
+def _recount_sql(table, recid):
+    """Return the statement recounting the counters of ``table``.
+
+    :param recid: SQL expression of the record, ``NEW.id_bibrec`` or
+        ``OLD.id_bibrec``
+    """
+    names = sorted(COUNTERS)
+    updated = [name for name in names if COUNTERS[name][0] == table]
+    # A new row gets every counter and is marked as computed, an existing
+    # row only gets the counters of this table and keeps last_updated.
+    return ('INSERT INTO record_counters (id_bibrec, %s, last_updated) '
+            'SELECT id, %s, NOW() FROM bibrec WHERE id=%s '
+            'ON DUPLICATE KEY UPDATE %s' % (
+                ', '.join(names),
+                ', '.join(_count_sql(name, recid) for name in names),
+                recid,
+                ', '.join('%s=VALUES(%s)' % (name, name)
+                          for name in updated)))
+
+
+def trigger_sql(table, event):
+    """Return the ``CREATE TRIGGER`` statement of ``table`` on ``event``."""
+    if event == 'INSERT':
+        body = _recount_sql(table, 'NEW.id_bibrec')
+    elif event == 'DELETE':
+        body = _recount_sql(table, 'OLD.id_bibrec')
+    else:
+        body = ('BEGIN %s; IF NOT NEW.id_bibrec<=>OLD.id_bibrec THEN %s; '
+                'END IF; END' % (_recount_sql(table, 'OLD.id_bibrec'),
+                                 _recount_sql(table, 'NEW.id_bibrec')))
+    return 'CREATE TRIGGER %s AFTER %s ON %s FOR EACH ROW %s' % (
+        trigger_name(table, event), event, table, body)
+
+
+def create_triggers():
+    """Create (or replace) the triggers of every source table."""
+    from invenio.legacy.dbquery import run_sql
+
+    for table in TRIGGER_TABLES:
+        for event in EVENTS:
+            run_sql('DROP TRIGGER IF EXISTS %s' % trigger_name(table, event))
+            run_sql(trigger_sql(table, event))
+
+
+def drop_triggers():
+    """Remove the triggers of every source table."""
+    from invenio.legacy.dbquery import run_sql
+
+    for table in TRIGGER_TABLES:
+        for event in EVENTS:
+            run_sql('DROP TRIGGER IF EXISTS %s' % trigger_name(table, event))
+
+
+def register_triggers(tables):
+    """Create the triggers whenever a source table is created.
+
+    :param tables: ``{name: Table}`` of the source tables
+    """
+    from sqlalchemy import DDL, event
+
+    for table in TRIGGER_TABLES:
+        for trigger_event in EVENTS:
+            event.listen(tables[table], 'after_create', DDL(
+                trigger_sql(table, trigger_event).replace('%', '%%'))
+                .execute_if(dialect='mysql'))
+
+
+__all__ = ('TRIGGER_TABLES', 'create_triggers', 'drop_triggers',
+           'register_triggers', 'trigger_name', 'trigger_sql', )
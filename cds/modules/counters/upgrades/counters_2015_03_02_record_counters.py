@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Create the record counters table and its triggers."""
+
+from invenio.legacy.dbquery import run_sql
+from invenio.modules.upgrader.api import op
+from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy.dialects import mysql
+
+depends_on = ['invenio_release_1_1_0']
+
+
+def info():
+    """Return upgrade recipe information."""
+    return "Create record_counters, its triggers and compute its rows"
+
+
+def do_upgrade():
+    """Implement your upgrades here."""
+    from cds.modules.counters.api import rebuild_counters
+    from cds.modules.counters.triggers import create_triggers
+
+    if 'record_counters' not in op.get_bind().table_names():
+        op.create_table(
+            'record_counters',
+            Column('id_bibrec', mysql.MEDIUMINT(8, unsigned=True),
+                   ForeignKey('bibrec.id'), primary_key=True,
+                   nullable=False),
+            Column('number_of_comments', mysql.INTEGER(15, unsigned=True),
+                   nullable=False, server_default='0'),
+            Column('number_of_reviews', mysql.INTEGER(15, unsigned=True),
+                   nullable=False, server_default='0'),
+            Column('number_of_copies', mysql.INTEGER(15, unsigned=True),
+                   nullable=False, server_default='0'),
+            Column('cited_by_count', mysql.INTEGER(15, unsigned=True),
+                   nullable=False, server_default='0'),
+            Column('last_updated', DateTime, nullable=False,
+                   server_default='1900-01-01 00:00:00'),
+            mysql_charset='utf8',
+        )
+    # Triggers first, so that no write is missed while the rows are built.
+    create_triggers()
+    rebuild_counters()
+
+
+def estimate():
+    """Estimate running time of upgrade in seconds (optional)."""
+    return run_sql('SELECT COUNT(*) FROM bibrec')[0][0] // 1000 + 1
+
+
+def pre_upgrade():
+    """Run pre-upgrade checks (optional)."""
+    pass
+
+
+def post_upgrade():
+    """Run post-upgrade checks (optional)."""
+    pass
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Compiled field definitions.
+
+Parsing ``atlantis.cfg`` (and the other field configuration files) with the
+JSONAlchemy parser is done by every new process.  The parsed rules, with
+their creators, producers, derived and calculated definitions and decorator
+arguments, are plain data: they are pickled to an artifact whose name
+contains a digest of the source files, and later processes load the artifact
+instead of parsing again.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import os
+
+from six.moves import cPickle
+
+from cds.utils import write_atomically
+
+from .config import FIELDDEFS_CACHE_DIRNAME
+
+
+def source_files(namespace):
+    """Return the field and model definition files parsed for ``namespace``.
+
+    They are listed by the JSONAlchemy registries, which the parser reads,
+    so the files of every package (Invenio and its overlays) are included.
+    """
+    from invenio.modules.jsonalchemy.registry import fields_definitions, \
+        models_definitions
+
+    return sorted(set(fields_definitions(namespace)) |
+                  set(models_definitions(namespace)))
+
+
+def source_digest(namespace):
+    """Return the digest of the sources of ``namespace`` definitions.
+
+    It covers the path and content of every file of :func:`source_files`
+    and the installed Invenio version, which ships the parser.
+    """
+    from invenio.version import __version__ as invenio_version
+
+    digest = hashlib.sha1()
+    digest.update(namespace.encode('utf-8'))
+    digest.update(invenio_version.encode('utf-8'))
+    for path in source_files(namespace):
+        digest.update(path.encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def artifact_path(namespace, digest=None):
+    """Return the path of the compiled artifact of ``namespace``."""
+    from invenio.config import CFG_CACHEDIR
+    return os.path.join(CFG_CACHEDIR, FIELDDEFS_CACHE_DIRNAME,
+                        '%s-%s.pickle' % (namespace,
+                                          digest or source_digest(namespace)))
+
+
+def compile_field_definitions(namespace):
+    """Parse the definitions of ``namespace`` and write their artifact.
+
+    The artifact is written to a temporary file first and renamed, so a
+    concurrent reader never sees a partial file.
+
+    :return: path of the artifact
+    """
+    from invenio.modules.jsonalchemy.parser import FieldParser
+
+    FieldParser.reparse(namespace)
+    data = (FieldParser._field_definitions[namespace],
+            FieldParser._legacy_field_matchings[namespace])
+    path = artifact_path(namespace)
+    write_atomically(path, lambda f: cPickle.dump(
+        data, f, cPickle.HIGHEST_PROTOCOL))
+    return path
+
+
+def load_field_definitions(namespace):
+    """Install the compiled definitions of ``namespace`` in the parser.
+
+    The artifact matching the current sources is compiled first if it does
+    not exist yet.  The MARC tag dispatch index of the definitions is built
+    as well.
+
+    :return: ``True`` if an existing artifact was loaded
+    """
+    from invenio.modules.jsonalchemy.parser import FieldParser
+
+    from .dispatch import get_dispatch_index
+
+    path = artifact_path(namespace)
+    loaded = os.path.exists(path)
+    if loaded:
+        with open(path, 'rb') as f:
+            field_definitions, legacy_field_matchings = cPickle.load(f)
+        FieldParser._field_definitions[namespace] = field_definitions
+        FieldParser._legacy_field_matchings[namespace] = \
+            legacy_field_matchings
+    else:
+        compile_field_definitions(namespace)
+    get_dispatch_index(namespace)
+    return loaded
+
+
+def clean_artifacts(namespace):
+    """Remove the artifacts of ``namespace`` built from older sources.
+
+    :return: list of removed paths
+    """
+    current = artifact_path(namespace)
+    directory = os.path.dirname(current)
+    if not os.path.isdir(directory):
+        return []
+    removed = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(namespace + '-') and path != current:
+            os.unlink(path)
+            removed.append(path)
+    return removed
+
+
+__all__ = ('artifact_path', 'clean_artifacts', 'compile_field_definitions',
+           'load_field_definitions', 'source_digest', 'source_files', )
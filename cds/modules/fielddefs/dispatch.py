@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""MARC tag dispatch index for the creator rules.
+
+The MARC reader of JSONAlchemy finds the datafields of every creator rule by
+matching each of the rule source tags, as a regular expression, against every
+key of the record.  :class:`TagDispatchIndex` is built once from the field
+definitions: it knows which source tags can match a given datafield key, so a
+record is grouped in a single pass over its datafields and each rule gets its
+elements with a dictionary lookup.
+"""
+
+from __future__ import absolute_import
+
+import re
+
+METACHARACTERS = frozenset('.^$*+?{}[]\\|()%')
+"""Characters making a source tag a pattern rather than a literal tag."""
+
+
+class TagDispatchIndex(object):
+
+    """Map MARC datafield keys to the source tags of the creator rules.
+
+    Source tags starting with a literal three character tag (``"520__"``,
+    ``"8564_"``, ``"003"``...) are indexed by that tag, so only a handful of
+    candidates are checked for a given key.  Tags with wildcard indicators
+    are checked as regular expressions against the keys sharing their tag;
+    the result is cached per key.
+    """
+
+    def __init__(self, field_definitions, master_format='marc'):
+        self.rules = {}
+        self._by_tag = {}
+        self._generic = []
+        self._keys = {}
+        for field_name, definition in field_definitions.items():
+            if not isinstance(definition, dict):
+                continue
+            rules = definition.get('rules', {})
+            if not isinstance(rules, dict):
+                continue
+            for rule in rules.get(master_format, []):
+                for source_tag in rule.get('source_tags') or []:
+                    self._add(source_tag, field_name, rule)
+
+    def _add(self, source_tag, field_name, rule):
+        if source_tag not in self.rules:
+            self.rules[source_tag] = []
+            pattern = (source_tag, re.compile(source_tag))
+            if METACHARACTERS.intersection(source_tag[:3]) or \
+                    len(source_tag) < 3:
+                self._generic.append(pattern)
+            else:
+                self._by_tag.setdefault(source_tag[:3], []).append(pattern)
+        self.rules[source_tag].append((field_name, rule))
+
+    def source_tags_for(self, key):
+        """Return the source tags matching the datafield ``key``."""
+        try:
+            return self._keys[key]
+        except KeyError:
+            pass
+        candidates = self._by_tag.get(key[:3], []) + self._generic
+        tags = self._keys[key] = [source_tag for source_tag, regex
+                                  in candidates if regex.match(key)]
+        return tags
+
+    def rules_for(self, key):
+        """Return the ``(field_name, rule)`` pairs fed by ``key``."""
+        return [rule for source_tag in self.source_tags_for(key)
+                for rule in self.rules[source_tag]]
+
+    def group(self, blob):
+        """Group the keys of ``blob`` by the source tags they match.
+
+        :return: dictionary ``{source_tag: [key, ...]}`` with the keys in the
+            order of the blob
+        """
+        grouped = {}
+        for key in blob:
+            for source_tag in self.source_tags_for(key):
+                grouped.setdefault(source_tag, []).append(key)
+        return grouped
+
+
+_indexes = {}
+
+
+def get_dispatch_index(namespace):
+    """Return the dispatch index of the current definitions of ``namespace``.
+
+    The index is rebuilt whenever the parser loads new definitions.
+    """
+    from invenio.modules.jsonalchemy.parser import FieldParser
+
+    field_definitions = FieldParser.field_definitions(namespace)
+    index = _indexes.get(namespace)
+    if index is None or index[0] is not field_definitions:
+        index = _indexes[namespace] = (field_definitions,
+                                       TagDispatchIndex(field_definitions))
+    return index[1]
+
+
+def get_elements_from_blob(self, regex_key):
+    """Return the blob elements of the given source tags.
+
+    Replacement of ``MarcReader._get_elements_from_blob`` grouping the
+    record once with :class:`TagDispatchIndex`.  Source tags unknown to the
+    index fall back to a regular expression scan.
+    """
+    if regex_key in ('entire_record', '*'):
+        return self._blob
+    grouped = getattr(self, '_cds_grouped_blob', None)
+    if grouped is None or grouped[0] is not self._blob:
+        index = get_dispatch_index(self._json.additional_info.namespace)
+        grouped = self._cds_grouped_blob = (self._blob,
+                                            index.group(self._blob))
+    elements = []
+    for source_tag in regex_key:
+        keys = grouped[1].get(source_tag)
+        if keys is None:
+            regex = re.compile(source_tag)
+            keys = [key for key in self._blob if regex.match(key)]
+        elements.extend(self._blob.get(key) for key in keys)
+    return elements
+
+
+_original_get_elements_from_blob = None
+
+
+def install_marc_dispatch(install=True):
+    """Make the JSONAlchemy MARC reader use the dispatch index.
+
+    :param install: ``False`` restores the original regular expression scan
+    """
+    from invenio.modules.jsonalchemy.jsonext.readers.marc_reader import \
+        MarcReader
+
+    global _original_get_elements_from_blob
+    current = MarcReader.__dict__['_get_elements_from_blob']
+    if current is not get_elements_from_blob:
+        _original_get_elements_from_blob = current
+    if install:
+        MarcReader._get_elements_from_blob = get_elements_from_blob
+    elif _original_get_elements_from_blob is not None:
+        MarcReader._get_elements_from_blob = _original_get_elements_from_blob
+
+
+__all__ = ('TagDispatchIndex', 'get_dispatch_index', 'get_elements_from_blob',
+           'install_marc_dispatch', )
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Compile the JSONAlchemy field definitions."""
+
+from __future__ import print_function
+
+import time
+
+from invenio.ext.script import Manager
+
+manager = Manager(usage=__doc__)
+
+option_namespace = manager.option('-n', '--namespace', dest='namespace',
+                                  default='recordext',
+                                  help='JSONAlchemy namespace')
+
+
+@option_namespace
+def build(namespace='recordext'):
+    """Write the compiled artifact of the current field definitions."""
+    from .api import clean_artifacts, compile_field_definitions, \
+        source_files
+    print(">>> Compiled", compile_field_definitions(namespace), "from",
+          len(source_files(namespace)), "files")
+    for path in clean_artifacts(namespace):
+        print(">>> Removed", path)
+
+
+@option_namespace
+@manager.option('-r', '--repeat', dest='repeat', type=int, default=5,
+                help='number of measures')
+def benchmark(namespace='recordext', repeat=5):
+    """Compare parsing the definitions with loading the artifact."""
+    from invenio.modules.jsonalchemy.parser import FieldParser
+    from .api import compile_field_definitions, load_field_definitions
+
+    compile_field_definitions(namespace)
+    cold, warm = [], []
+    for _ in range(repeat):
+        start = time.time()
+        FieldParser.reparse(namespace)
+        cold.append(time.time() - start)
+
+        FieldParser._field_definitions.pop(namespace, None)
+        FieldParser._legacy_field_matchings.pop(namespace, None)
+        start = time.time()
+        load_field_definitions(namespace)
+        warm.append(time.time() - start)
+
+    print("cold (parse): best %.3fs, mean %.3fs" % (
+        min(cold), sum(cold) / repeat))
+    print("warm (load):  best %.3fs, mean %.3fs" % (
+        min(warm), sum(warm) / repeat))
+    print("speed-up:     %.1fx" % (min(cold) / max(min(warm), 1e-6)))
+
+
+@option_namespace
+@manager.option('-f', '--file', dest='marcxml', default=None,
+                help='MARCXML file (demo records by default)')
+def benchmark_marc(namespace='recordext', marcxml=None):
+    """Compare MARC to JSON conversion with and without the tag index."""
+    import pkg_resources
+    from xml.etree import ElementTree
+    from invenio.modules.records.api import Record
+    from .dispatch import install_marc_dispatch
+
+    if marcxml is None:
+        marcxml = pkg_resources.resource_filename(
+            'cds', 'demosite/data/cds-demobibdata.xml')
+    records = [ElementTree.tostring(element) for element
+               in ElementTree.parse(marcxml).getroot().iter()
+               if element.tag.rsplit('}', 1)[-1] == 'record']
+
+    def convert():
+        start = time.time()
+        for blob in records:
+            Record.create(blob, master_format='marc', namespace=namespace)
+        return len(records) / (time.time() - start)
+
+    install_marc_dispatch(False)
+    convert()
+    before = convert()
+    install_marc_dispatch()
+    convert()
+    after = convert()
+    print("%d records" % len(records))
+    print("regex scan:     %.1f records/s" % before)
+    print("dispatch index: %.1f records/s" % after)
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Format the records of a page together.
+
+:func:`format_records` serves the records found in the rendered record
+cache (see :mod:`.cache`) and those whose ``bibfmt`` output, written by
+``bibreformat``, is fresh (not older than the record) without rendering.
+For the others it loads the MARCXML, the files and the counters of the
+whole page with a fixed number of queries and only then renders them one
+by one, so the calculated fields read prefetched values.
+"""
+
+from __future__ import absolute_import
+
+import zlib
+
+from cds.utils import chunks, placeholders
+
+from .cache import get_record_versions, get_rendered, is_cached_format, \
+    set_rendered
+from .config import FORMATCACHE_CHUNK_SIZE
+
+
+def get_preformatted_records(recids, of):
+    """Return the fresh ``bibfmt`` output of ``recids`` in format ``of``.
+
+    :return: dictionary ``{recid: (value, needs_2nd_pass)}``
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    preformatted = {}
+    for chunk in chunks(sorted(set(recids)), FORMATCACHE_CHUNK_SIZE):
+        for recid, value, needs_2nd_pass in run_sql(
+                'SELECT f.id_bibrec, f.value, f.needs_2nd_pass '
+                'FROM bibfmt AS f JOIN bibrec AS r ON r.id=f.id_bibrec '
+                'WHERE f.format=%%s AND f.id_bibrec IN (%s) '
+                'AND f.last_updated>=r.modification_date' %
+                placeholders(chunk), (of, ) + tuple(chunk)):
+            preformatted[recid] = (zlib.decompress(value), needs_2nd_pass)
+    return preformatted
+
+
+def _uses_preformatted(of, ln):
+    """Return whether ``bibfmt`` output of ``of`` can be shown in ``ln``.
+
+    Mirrors ``format_record``: cached output is in the site language,
+    unless internationalization is disabled for the format.
+    """
+    from flask import current_app
+    config = current_app.config
+    return ln == config['CFG_SITE_LANG'] or of.lower() in config.get(
+        'CFG_BIBFORMAT_DISABLE_I18N_FOR_CACHED_FORMATS', [])
+
+
+def prefetch_records(recids):
+    """Load the MARCXML, files and counters of ``recids`` in bulk.
+
+    :return: dictionary ``{recid: MARCXML}`` of the records with fresh
+        ``xm`` output
+    """
+    from cds.modules.counters.api import COUNTERS, prefetch_counters
+    from cds.modules.counters.citations import get_citation_counts_bulk
+    from cds.modules.recordfiles.api import prefetch_files
+
+    prefetch_files(recids)
+    prefetch_counters(recids, [name for name in COUNTERS
+                               if name != 'cited_by_count'])
+    # Read from the citation count array, or prefetched if it is stale.
+    get_citation_counts_bulk(recids)
+    return dict((recid, value) for recid, (value, _)
+                in get_preformatted_records(recids, 'xm').items())
+
+
+def render_records(recids, of, ln, versions=None, **kwargs):
+    """Render ``recids`` after prefetching their data.
+
+    :param versions: versions of the records read before rendering;
+        when given the output is stored in the rendered record cache
+    :return: dictionary ``{recid: output}``
+    """
+    from invenio.modules.formatter import format_record
+
+    recids = sorted(set(recids))
+    xml_records = prefetch_records(recids)
+    rendered = dict((recid, format_record(recid, of, ln=ln,
+                                          xml_record=xml_records.get(recid),
+                                          **kwargs))
+                    for recid in recids)
+    if versions is not None:
+        set_rendered(rendered, of, ln, versions)
+    return rendered
+
+
+def format_records(recids, of, ln=None, **kwargs):
+    """Format ``recids`` in output format ``of``.
+
+    :param kwargs: passed to ``format_record``
+    :return: list of formatted records, in the order of ``recids``
+    """
+    from flask import g
+
+    recids = [int(recid) for recid in recids]
+    ln = ln or getattr(g, 'ln', None)
+    formatted = {}
+    # Extra arguments (e.g. a search pattern) change the output.
+    cached = is_cached_format(of) and not kwargs
+    if cached:
+        versions = get_record_versions(recids)
+        formatted.update(get_rendered(recids, of, ln, versions))
+    missing = [recid for recid in recids if recid not in formatted]
+    if missing and _uses_preformatted(of, ln) and \
+            not kwargs.get('on_the_fly'):
+        for recid, (value, needs_2nd_pass) in get_preformatted_records(
+                missing, of).items():
+            if not needs_2nd_pass:
+                formatted[recid] = value
+    missing = [recid for recid in recids if recid not in formatted]
+    if missing:
+        formatted.update(render_records(missing, of, ln,
+                                        versions if cached else None,
+                                        **kwargs))
+    return [formatted[recid] for recid in recids]
+
+
+__all__ = ('format_records', 'get_preformatted_records',
+           'prefetch_records', 'render_records', )
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Cache of rendered records.
+
+Rendered output is stored under ``(recid, format, language, template
+version)``.  The template version hashes the output format rules, the
+source of every format template they use and of the Jinja templates these
+include, and the modification times of the format elements, so editing any
+of them switches to new keys.  Versions are recomputed every
+``FORMATCACHE_VERSION_CHECK_INTERVAL`` seconds.
+
+Each entry also carries the version of the record it was rendered from
+(see :func:`get_record_versions`): the modification dates of the record
+and of its files, and the counters the templates show.  An entry is only
+served while all of them are unchanged, so a new comment, loan, citation
+or file renders the record again even though ``bibrec`` was not touched.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import os
+import time
+
+from cds.utils import chunks, placeholders
+
+from .config import FORMATCACHE_CHUNK_SIZE, FORMATCACHE_FORMATS, \
+    FORMATCACHE_TIMEOUT, FORMATCACHE_VERSION_CHECK_INTERVAL
+
+_template_versions = {}
+
+
+def _jinja_sources(name, seen):
+    """Yield the source of Jinja template ``name`` and of its includes."""
+    from flask import current_app
+    from jinja2 import meta
+
+    if name in seen:
+        return
+    seen.add(name)
+    env = current_app.jinja_env
+    source = env.loader.get_source(env, name)[0]
+    yield source
+    for included in meta.find_referenced_templates(env.parse(source)):
+        if included:
+            for included_source in _jinja_sources(included, seen):
+                yield included_source
+
+
+def _template_sources(name, seen):
+    """Yield the source of format template ``name`` and its dependencies."""
+    from invenio.modules.formatter import engine
+
+    if name.endswith('.tpl'):
+        return _jinja_sources('format/record/' + name, seen)
+    return iter([engine.get_format_template(name)['code']])
+
+
+def _element_times():
+    """Return the modification times of the format elements."""
+    from invenio.modules.formatter.registry import format_elements
+
+    times = []
+    for module in format_elements:
+        path = getattr(module, '__file__', None)
+        if path:
+            path = path[:-1] if path.endswith('.pyc') else path
+            try:
+                times.append((module.__name__, os.path.getmtime(path)))
+            except OSError:
+                pass
+    return sorted(times)
+
+
+def _compute_version(of):
+    from invenio.modules.formatter import engine
+
+    output_format = engine.get_output_format(of)
+    templates = [output_format['default']] + [
+        rule['template'] for rule in output_format['rules']]
+    digest = hashlib.sha1(repr(output_format).encode('utf-8'))
+    digest.update(repr(_element_times()).encode('utf-8'))
+    seen = set()
+    for name in templates:
+        if name:
+            for source in _template_sources(name, seen):
+                digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def template_version(of):
+    """Return the digest of the output format ``of`` and its templates."""
+    checked, version = _template_versions.get(of, (0, None))
+    if time.time() - checked > FORMATCACHE_VERSION_CHECK_INTERVAL:
+        version = _compute_version(of)
+        _template_versions[of] = (time.time(), version)
+    return version
+
+
+def _cache_key(recid, of, ln):
+    return 'formatcache::%s::%s::%s::%s' % (recid, of, ln,
+                                            template_version(of))
+
+
+def _file_dates(recids):
+    """Return ``{recid: last modification of its documents}``."""
+    from invenio.legacy.dbquery import run_sql
+
+    return dict(run_sql(
+        'SELECT bd.id_bibrec, MAX(d.modification_date) '
+        'FROM bibrec_bibdoc AS bd JOIN bibdoc AS d ON d.id=bd.id_bibdoc '
+        'WHERE bd.id_bibrec IN (%s) GROUP BY bd.id_bibrec' %
+        placeholders(recids), tuple(recids)))
+
+
+def get_record_versions(recids):
+    """Return ``{recid: version}`` of the existing records.
+
+    The version of a record is a tuple of its modification date, the last
+    modification date of its files, its stored counters and its citation
+    count, as read by the calculated fields.
+    """
+    from cds.modules.counters.api import COUNTERS, read_counters
+    from cds.modules.counters.citations import get_citation_counts
+    from invenio.legacy.dbquery import run_sql
+
+    names = sorted(name for name in COUNTERS if name != 'cited_by_count')
+    citations = get_citation_counts()
+    versions = {}
+    for chunk in chunks(sorted(set(recids)), FORMATCACHE_CHUNK_SIZE):
+        dates = dict(run_sql(
+            'SELECT id, modification_date FROM bibrec WHERE id IN (%s)' %
+            placeholders(chunk), tuple(chunk)))
+        if not dates:
+            continue
+        chunk = sorted(dates)
+        file_dates = _file_dates(chunk)
+        counters = read_counters(chunk)
+        cited = citations.get_many(chunk) if citations is not None else {}
+        for recid in chunk:
+            stored = counters.get(recid, {})
+            versions[recid] = (
+                dates[recid], file_dates.get(recid),
+                tuple(stored.get(name) for name in names),
+                cited.get(recid, stored.get('cited_by_count')))
+    return versions
+
+
+def is_cached_format(of):
+    """Return whether the rendered records in ``of`` are cached."""
+    return of.upper() in FORMATCACHE_FORMATS
+
+
+def get_rendered(recids, of, ln, versions=None):
+    """Return the fresh rendered ``recids`` in the cache.
+
+    :param versions: record versions from :func:`get_record_versions`
+    :return: dictionary ``{recid: output}``
+    """
+    from invenio.ext.cache import cache
+
+    recids = list(recids)
+    if not recids:
+        return {}
+    if versions is None:
+        versions = get_record_versions(recids)
+    keys = [_cache_key(recid, of, ln) for recid in recids]
+    rendered = {}
+    for recid, entry in zip(recids, cache.get_many(*keys)):
+        if entry is not None and entry[0] == versions.get(recid):
+            rendered[recid] = entry[1]
+    return rendered
+
+
+def set_rendered(outputs, of, ln, versions):
+    """Store rendered records.
+
+    :param outputs: dictionary ``{recid: output}``
+    :param versions: versions of the records read before rendering
+    """
+    from invenio.ext.cache import cache
+
+    mapping = dict((_cache_key(recid, of, ln), (versions[recid], output))
+                   for recid, output in outputs.items() if recid in versions)
+    if mapping:
+        cache.set_many(mapping, timeout=FORMATCACHE_TIMEOUT)
+
+
+__all__ = ('get_record_versions', 'get_rendered', 'is_cached_format',
+           'set_rendered', 'template_version', )
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Record formatting configuration."""
+
+FORMATCACHE_CHUNK_SIZE = 500
+"""Maximum number of records read from ``bibfmt`` with one query."""
+
+FORMATCACHE_FORMATS = ['HB', 'HD']
+"""Output formats whose rendered records are cached."""
+
+FORMATCACHE_TIMEOUT = 7 * 24 * 3600
+"""Seconds a rendered record stays in the cache."""
+
+FORMATCACHE_VERSION_CHECK_INTERVAL = 30
+"""Seconds between two computations of the template version of a format."""
+
+FORMATCACHE_PREWARM_CHUNK_SIZE = 200
+"""Records rendered by a prewarm worker per task."""
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Manage the rendered record cache."""
+
+from __future__ import print_function
+
+from invenio.ext.script import Manager
+
+from .config import FORMATCACHE_FORMATS, FORMATCACHE_PREWARM_CHUNK_SIZE
+
+manager = Manager(usage=__doc__)
+
+
+@manager.option('-o', '--format', dest='formats', action='append',
+                default=None, help='output format (repeatable)')
+@manager.option('-l', '--lang', dest='langs', action='append',
+                default=None, help='language (repeatable)')
+@manager.option('-r', '--recid', dest='recids', action='append', type=int,
+                default=None, help='record to render (repeatable)')
+@manager.option('-j', '--jobs', dest='jobs', type=int, default=None,
+                help='number of processes (default: number of CPUs)')
+@manager.option('-c', '--chunk-size', dest='chunk_size', type=int,
+                default=FORMATCACHE_PREWARM_CHUNK_SIZE,
+                help='records per task')
+def prewarm(formats=None, langs=None, recids=None, jobs=None,
+            chunk_size=FORMATCACHE_PREWARM_CHUNK_SIZE):
+    """Render the stale records into the cache."""
+    import time
+
+    from flask import current_app
+    from invenio.legacy.dbquery import run_sql
+
+    from .prewarm import prewarm as run_prewarm
+
+    formats = formats or FORMATCACHE_FORMATS
+    langs = langs or [current_app.config['CFG_SITE_LANG']]
+    if not recids:
+        recids = [row[0] for row in run_sql('SELECT id FROM bibrec')]
+    print(">>> Rendering %d records in %s (%s)..." % (
+        len(recids), ', '.join(formats), ', '.join(langs)))
+    start = time.time()
+    checked = rendered = 0
+    for chunk_checked, chunk_rendered in run_prewarm(
+            recids, formats, langs, jobs, chunk_size):
+        checked += chunk_checked
+        rendered += chunk_rendered
+    print(">>> %d rendered, %d fresh, %.1fs" % (
+        rendered, checked - rendered, time.time() - start))
+
+
+@manager.command
+def version():
+    """Print the template version of the cached formats."""
+    from .cache import template_version
+    for of in FORMATCACHE_FORMATS:
+        print("%s %s" % (of, template_version(of)))
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
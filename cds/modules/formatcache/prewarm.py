@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Fill the rendered record cache in parallel.
+
+Chunks of records are rendered by a pool of processes, each with its own
+application and request context.  Records whose cached output is still
+fresh are skipped, so an interrupted prewarm resumes where it stopped.
+"""
+
+from __future__ import absolute_import
+
+import multiprocessing
+
+from .config import FORMATCACHE_PREWARM_CHUNK_SIZE
+
+
+def _init_worker():
+    """Create the application of a worker."""
+    from invenio.base.factory import create_app
+
+    app = create_app()
+    app.test_request_context().push()
+
+
+def prewarm_chunk(recids, formats, langs):
+    """Render the stale ``recids`` in every format and language.
+
+    :return: tuple ``(records checked, records rendered)``
+    """
+    from .api import render_records
+    from .cache import get_record_versions, get_rendered
+
+    versions = get_record_versions(recids)
+    recids = sorted(versions)
+    rendered = 0
+    for of in formats:
+        for ln in langs:
+            fresh = get_rendered(recids, of, ln, versions)
+            stale = [recid for recid in recids if recid not in fresh]
+            if stale:
+                rendered += len(render_records(stale, of, ln, versions))
+    return len(recids) * len(formats) * len(langs), rendered
+
+
+def _prewarm_chunk(args):
+    return prewarm_chunk(*args)
+
+
+def prewarm(recids, formats, langs, jobs=None,
+            chunk_size=FORMATCACHE_PREWARM_CHUNK_SIZE):
+    """Render ``recids`` on ``jobs`` processes.
+
+    :return: iterator of ``(records checked, records rendered)`` per chunk
+    """
+    recids = sorted(set(recids))
+    tasks = [(recids[i:i + chunk_size], formats, langs)
+             for i in range(0, len(recids), chunk_size)]
+    jobs = jobs or multiprocessing.cpu_count()
+    if jobs == 1:
+        from flask import current_app
+
+        # Render in the same request context as the pool workers.
+        with current_app.test_request_context():
+            for task in tasks:
+                yield _prewarm_chunk(task)
+        return
+
+    pool = multiprocessing.Pool(jobs, initializer=_init_worker)
+    try:
+        for result in pool.imap_unordered(_prewarm_chunk, tasks):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+__all__ = ('prewarm', 'prewarm_chunk', )
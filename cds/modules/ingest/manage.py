@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Stream large MARCXML files."""
+
+from __future__ import print_function
+
+import json
+import sys
+
+from invenio.ext.script import Manager
+
+from .config import INGEST_CHUNK_SIZE
+
+manager = Manager(usage=__doc__)
+
+option_chunk_size = manager.option('-c', '--chunk-size', dest='chunk_size',
+                                   type=int, default=INGEST_CHUNK_SIZE,
+                                   help='number of records per chunk')
+
+
+@option_chunk_size
+@manager.option('-j', '--jobs', dest='jobs', type=int, default=None,
+                help='number of worker processes (default: number of CPUs)')
+@manager.option('-o', '--output', dest='output', default=None,
+                help='JSON lines output file (default: stdout)')
+@manager.option('source', help='MARCXML file')
+def convert(source, output=None, jobs=None, chunk_size=INGEST_CHUNK_SIZE):
+    """Convert a MARCXML file to JSON lines through the field definitions."""
+    from .pipeline import parallel_convert
+
+    stream = open(output, 'w') if output else sys.stdout
+    count = 0
+    try:
+        for count, record in enumerate(
+                parallel_convert(source, jobs, chunk_size), 1):
+            stream.write(json.dumps(record, default=str))
+            stream.write('\n')
+    finally:
+        if output:
+            stream.close()
+    print(">>> %d records converted." % count, file=sys.stderr)
+
+
+@option_chunk_size
+@manager.option('target', help='file name pattern, e.g. /tmp/chunk-%%05d.xml')
+@manager.option('source', help='MARCXML file')
+def split(source, target, chunk_size=INGEST_CHUNK_SIZE):
+    """Split a MARCXML file into files of a bounded number of records."""
+    from .reader import write_marcxml_chunks
+
+    for name in write_marcxml_chunks(source, target, chunk_size):
+        print(name)
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
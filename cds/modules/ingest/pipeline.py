@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Parallel MARCXML to JSON conversion.
+
+Conversion through the creator rules is CPU bound pure Python, so chunks of
+the streamed records are spread over a pool of processes.  Every worker
+creates its own application and loads its own copy of the compiled field
+definitions.  Results are yielded in input order and only a bounded number
+of chunks is in flight at any time.
+"""
+
+from __future__ import absolute_import
+
+import multiprocessing
+from collections import deque
+
+from .config import INGEST_CHUNK_SIZE, INGEST_NAMESPACE
+from .reader import convert_chunk, iter_chunks, iter_marcxml_records
+
+_namespace = INGEST_NAMESPACE
+
+
+def _init_worker(namespace):
+    """Create the application of a worker and load the field definitions."""
+    from invenio.base.factory import create_app
+    from cds.modules.fielddefs.api import load_field_definitions
+
+    global _namespace
+    _namespace = namespace
+    app = create_app()
+    app.app_context().push()
+    load_field_definitions(namespace)
+
+
+def _convert(chunk):
+    return convert_chunk(chunk, _namespace)
+
+
+def parallel_convert(source, jobs=None, chunk_size=INGEST_CHUNK_SIZE,
+                     namespace=INGEST_NAMESPACE):
+    """Yield the JSON of every record of ``source`` converted by ``jobs``.
+
+    :param jobs: number of worker processes, the number of CPUs by default;
+        with one job the records are converted in the current process
+    """
+    from .reader import stream_convert
+
+    jobs = jobs or multiprocessing.cpu_count()
+    if jobs == 1:
+        for record in stream_convert(source, chunk_size, namespace):
+            yield record
+        return
+
+    pool = multiprocessing.Pool(jobs, initializer=_init_worker,
+                                initargs=(namespace, ))
+    try:
+        pending = deque()
+        for chunk in iter_chunks(iter_marcxml_records(source), chunk_size):
+            pending.append(pool.apply_async(_convert, (chunk, )))
+            if len(pending) >= 2 * jobs:
+                for record in pending.popleft().get():
+                    yield record
+        while pending:
+            for record in pending.popleft().get():
+                yield record
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+__all__ = ('parallel_convert', )
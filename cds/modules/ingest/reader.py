@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Streaming MARCXML reader.
+
+The records of a MARCXML file are read one at a time with ``iterparse`` and
+every processed element is cleared, so memory stays bounded whatever the size
+of the file.
+"""
+
+from __future__ import absolute_import
+
+from itertools import islice
+from xml.etree import cElementTree as ElementTree
+
+from .config import INGEST_CHUNK_SIZE, INGEST_NAMESPACE
+
+MARC_NAMESPACE = 'http://www.loc.gov/MARC21/slim'
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_marcxml(source):
+    """Yield the ``<record>`` elements of a MARCXML file one by one.
+
+    A yielded element is only valid until the next one is read: it is
+    cleared, together with everything parsed so far, afterwards.
+
+    :param source: file name or file object
+    """
+    context = ElementTree.iterparse(source, events=('start', 'end'))
+    root = None
+    for event, element in context:
+        if root is None:
+            root = element
+        if event == 'end' and _local_name(element.tag) == 'record':
+            yield element
+            element.clear()
+            root.clear()
+
+
+def iter_marcxml_records(source):
+    """Yield every record of ``source`` as a standalone MARCXML string."""
+    ElementTree.register_namespace('', MARC_NAMESPACE)
+    for element in iter_marcxml(source):
+        yield ElementTree.tostring(element)
+
+
+def iter_chunks(iterable, chunk_size=INGEST_CHUNK_SIZE):
+    """Yield lists of at most ``chunk_size`` items of ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def convert_record(blob, namespace=INGEST_NAMESPACE):
+    """Convert a MARCXML record to JSON through the field definitions."""
+    from invenio.modules.records.api import Record
+    return Record.create(blob, master_format='marc',
+                         namespace=namespace).dumps()
+
+
+def convert_chunk(blobs, namespace=INGEST_NAMESPACE):
+    """Convert a list of MARCXML records, keeping their order."""
+    return [convert_record(blob, namespace) for blob in blobs]
+
+
+def stream_convert(source, chunk_size=INGEST_CHUNK_SIZE,
+                   namespace=INGEST_NAMESPACE):
+    """Yield the JSON of every record of ``source``, chunk by chunk."""
+    for chunk in iter_chunks(iter_marcxml_records(source), chunk_size):
+        for record in convert_chunk(chunk, namespace):
+            yield record
+
+
+def write_marcxml_chunks(source, target_pattern,
+                         chunk_size=INGEST_CHUNK_SIZE):
+    """Split ``source`` into MARCXML files of ``chunk_size`` records.
+
+    :param target_pattern: file name pattern receiving the chunk number,
+        e.g. ``'/tmp/records-%05d.xml'``
+    :return: list of written file names
+    """
+    names = []
+    for number, chunk in enumerate(
+            iter_chunks(iter_marcxml_records(source), chunk_size)):
+        name = target_pattern % number
+        with open(name, 'wb') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write(('<collection xmlns="%s">\n' % MARC_NAMESPACE).encode())
+            for blob in chunk:
+                f.write(blob)
+                f.write(b'\n')
+            f.write(b'</collection>\n')
+        names.append(name)
+    return names
+
+
+__all__ = ('convert_chunk', 'convert_record', 'iter_chunks', 'iter_marcxml',
+           'iter_marcxml_records', 'stream_convert', 'write_marcxml_chunks', )
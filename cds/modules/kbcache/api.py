@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Process wide compiled knowledge bases.
+
+Every knowledge base is compiled on first use (or by the pre-fork warmup)
+and tagged with a version: the number of its mappings and a checksum of
+their keys and values, computed by the database for all knowledge bases in
+one query.  Processes compare the versions every
+``KBCACHE_CHECK_INTERVAL`` seconds and recompile the edited knowledge
+bases, whichever way they were edited.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+
+from .compiled import CompiledKB
+from .config import KBCACHE_CHECK_INTERVAL
+
+_kbs = {}
+_versions = {}
+_checked = 0
+_lock = threading.Lock()
+
+
+def get_kb_versions():
+    """Return ``{kb name: version}`` of every knowledge base."""
+    from invenio.legacy.dbquery import run_sql
+    return dict((name, (count, checksum)) for name, count, checksum in run_sql(
+        'SELECT kb.name, COUNT(rv.id_knwKB), '
+        'COALESCE(SUM(CRC32(CONCAT_WS(0x1f, rv.m_key, rv.m_value))), 0) '
+        'FROM knwKB AS kb LEFT JOIN knwKBRVAL AS rv ON rv.id_knwKB=kb.id '
+        'GROUP BY kb.id, kb.name'))
+
+
+def compile_kb(name, version=None):
+    """Read the mappings of knowledge base ``name`` and compile them."""
+    from invenio.legacy.dbquery import run_sql
+    mappings = run_sql(
+        'SELECT rv.m_key, rv.m_value FROM knwKBRVAL AS rv '
+        'JOIN knwKB AS kb ON kb.id=rv.id_knwKB WHERE kb.name=%s', (name, ))
+    return CompiledKB(name, version, mappings)
+
+
+def _check_versions():
+    """Drop the compiled knowledge bases whose version changed."""
+    global _versions, _checked
+    versions = get_kb_versions()
+    for name, kb in list(_kbs.items()):
+        if versions.get(name) != kb.version:
+            del _kbs[name]
+    _versions, _checked = versions, time.time()
+
+
+def get_kb(name):
+    """Return the compiled knowledge base ``name``.
+
+    :raise KeyError: if the knowledge base does not exist
+    """
+    if time.time() - _checked > KBCACHE_CHECK_INTERVAL:
+        with _lock:
+            if time.time() - _checked > KBCACHE_CHECK_INTERVAL:
+                _check_versions()
+    kb = _kbs.get(name)
+    if kb is None:
+        with _lock:
+            if name not in _versions:
+                # The knowledge base may have been created since.
+                _check_versions()
+            if name not in _versions:
+                raise KeyError(name)
+            kb = _kbs.get(name)
+            if kb is None:
+                kb = _kbs[name] = compile_kb(name, _versions[name])
+    return kb
+
+
+def lookup(name, key, default=None):
+    """Return the value of ``key`` in knowledge base ``name``."""
+    return get_kb(name).get(key, default)
+
+
+def lookup_many(name, keys, default=None):
+    """Return ``{key: value}`` of ``keys`` in knowledge base ``name``."""
+    return get_kb(name).get_many(keys, default)
+
+
+def lookup_prefix(name, prefix, limit=None):
+    """Return the mappings of ``name`` whose key starts with ``prefix``."""
+    return get_kb(name).startswith(prefix, limit)
+
+
+def invalidate_kbs():
+    """Forget the compiled knowledge bases of this process."""
+    global _checked
+    with _lock:
+        _kbs.clear()
+        _checked = 0
+
+
+def warmup(app):
+    """Compile every knowledge base before the workers are forked."""
+    _check_versions()
+    for name in _versions:
+        get_kb(name)
+
+
+__all__ = ('compile_kb', 'get_kb', 'get_kb_versions', 'invalidate_kbs',
+           'lookup', 'lookup_many', 'lookup_prefix', 'warmup', )
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Knowledge base compiled into a hash map and a prefix trie."""
+
+
+class CompiledKB(object):
+
+    """Key/value mappings of a knowledge base.
+
+    Exact lookups use a dictionary; "starts with" lookups walk a trie of
+    the lowercased keys, as the SQL lookups ignore case.
+    """
+
+    def __init__(self, name, version, mappings):
+        """Compile ``mappings``, an iterable of ``(key, value)``."""
+        self.name = name
+        self.version = version
+        self.map = {}
+        self.lower = {}
+        self.trie = {}
+        for key, value in mappings:
+            self.map[key] = value
+            self.lower.setdefault(key.lower(), key)
+            node = self.trie
+            for char in key.lower():
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(key)
+
+    def __len__(self):
+        return len(self.map)
+
+    def __contains__(self, key):
+        return bool(key) and (key in self.map or key.lower() in self.lower)
+
+    def get(self, key, default=None):
+        """Return the value of ``key``, ignoring case if not found as is.
+
+        ``default`` is returned for ``None`` and empty keys.
+        """
+        if not key:
+            return default
+        if key in self.map:
+            return self.map[key]
+        key = self.lower.get(key.lower())
+        return self.map[key] if key is not None else default
+
+    def get_many(self, keys, default=None):
+        """Return ``{key: value}`` of ``keys``."""
+        return dict((key, self.get(key, default)) for key in keys)
+
+    def startswith(self, prefix, limit=None):
+        """Return the ``(key, value)`` whose key starts with ``prefix``.
+
+        :return: list sorted by key
+        """
+        node = self.trie
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        keys = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    keys.extend(child)
+                else:
+                    stack.append(child)
+        keys.sort()
+        if limit is not None:
+            keys = keys[:limit]
+        return [(key, self.map[key]) for key in keys]
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+
+"""Serve the knowledge base lookups of the format elements.
+
+Format elements translate values with ``BibFormatObject.kb`` (for example
+``BFE_META`` with its ``kb`` parameter), which runs one SQL query per
+lookup.  :func:`kb` answers them from the compiled knowledge bases.
+"""
+
+from __future__ import absolute_import
+
+from six import string_types
+
+from .api import get_kb
+
+
+def kb(self, kb, string, default=''):
+    """Return the value of ``string`` in knowledge base ``kb``.
+
+    Replacement of ``BibFormatObject.kb``.  Keys that are not strings are
+    looked up by the original method.
+    """
+    if not string:
+        return default
+    if not isinstance(string, string_types):
+        return _original_kb(self, kb, string, default)
+    try:
+        return get_kb(kb).get(string, default)
+    except KeyError:
+        return default
+
+
+_original_kb = None
+
+
+def install_formatter_kb(install=True):
+    """Make the format elements look values up in the compiled KBs.
+
+    :param install: ``False`` restores the original SQL lookups
+    """
+    from invenio.modules.formatter.engine import BibFormatObject
+
+    global _original_kb
+    current = BibFormatObject.__dict__['kb']
+    if current is not kb:
+        _original_kb = current
+    if install:
+        BibFormatObject.kb = kb
+    elif _original_kb is not None:
+        BibFormatObject.kb = _original_kb
+
+
+__all__ = ('install_formatter_kb', 'kb', )
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Inspect and benchmark the compiled knowledge bases."""
+
+from __future__ import print_function
+
+from invenio.ext.script import Manager
+
+manager = Manager(usage=__doc__)
+
+
+@manager.command
+def show():
+    """Print the version and size of every knowledge base."""
+    from .api import get_kb, get_kb_versions
+    for name, version in sorted(get_kb_versions().items()):
+        print("%-32s %6d mappings, version %s" % (name, len(get_kb(name)),
+                                                 '%d:%d' % version))
+
+
+@manager.option('-k', '--kb', dest='names', action='append', default=None,
+                help='knowledge base (repeatable, default: all)')
+@manager.option('-r', '--repeat', dest='repeat', type=int, default=3,
+                help='number of lookups of every key')
+def benchmark(names=None, repeat=3):
+    """Compare compiled lookups with row-at-a-time SQL lookups."""
+    import time
+
+    from invenio.legacy.dbquery import run_sql
+
+    from .api import get_kb, get_kb_versions, invalidate_kbs, lookup_many
+
+    invalidate_kbs()
+    for name in names or sorted(get_kb_versions()):
+        start = time.time()
+        keys = list(get_kb(name).map) * repeat
+        compile_time = time.time() - start
+        if not keys:
+            continue
+
+        start = time.time()
+        for key in keys:
+            run_sql('SELECT rv.m_value FROM knwKBRVAL AS rv '
+                    'JOIN knwKB AS kb ON kb.id=rv.id_knwKB '
+                    'WHERE kb.name=%s AND rv.m_key=%s', (name, key))
+        sql = time.time() - start
+
+        start = time.time()
+        lookup_many(name, keys)
+        compiled = time.time() - start
+        print("%-32s %6d lookups: sql %8.4fs, compiled %8.4fs "
+              "(compile %.4fs), speed-up %.0fx" % (
+                  name, len(keys), sql, compiled, compile_time,
+                  sql / max(compiled, 1e-6)))
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
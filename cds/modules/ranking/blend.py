@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Weighted blending of the rank methods of a collection.
+
+``collection_rnkMETHOD`` gives every collection several rank methods with
+a weight.  The blended score of a record is the weighted sum of its scores
+normalized by the highest score of each method.  The scores are gathered
+from the memory-mapped vectors of :mod:`.vectors`, and the normalization
+is folded into the weights: the highest score of a vector is computed once
+per compiled file, so nothing is recomputed or copied between two rank
+runs and the whole hit set is combined with one gather and one
+multiply-add per method.
+"""
+
+from __future__ import absolute_import
+
+from .config import RANKING_BLEND_METHOD
+from .vectors import get_rank_vector, numpy
+
+
+def get_collection_methods(collection):
+    """Return the ``(method, weight)`` of ``collection``.
+
+    The blend method itself is left out.
+    """
+    from invenio.legacy.dbquery import run_sql
+    return list(run_sql(
+        'SELECT m.name, cm.score FROM collection_rnkMETHOD AS cm '
+        'JOIN rnkMETHOD AS m ON m.id=cm.id_rnkMETHOD '
+        'JOIN collection AS c ON c.id=cm.id_collection '
+        'WHERE c.name=%s AND m.name!=%s ORDER BY cm.score DESC, m.name',
+        (collection, RANKING_BLEND_METHOD)))
+
+
+class Blender(object):
+
+    """Weighted combination of score vectors."""
+
+    def __init__(self, vectors):
+        """Prepare the combination.
+
+        :param vectors: list of ``(vector, weight)`` with
+            :class:`~.vectors.RankVector` objects; vectors without any
+            positive score are ignored
+        """
+        self.vectors = [(vector, float(weight) / vector.maximum)
+                        for vector, weight in vectors if vector.maximum > 0]
+
+    def scores(self, recids):
+        """Return the blended scores of ``recids``, in order."""
+        if numpy is None:
+            scores = [0.0] * len(recids)
+            for vector, factor in self.vectors:
+                for i, score in enumerate(vector.gather(recids)):
+                    scores[i] += factor * score
+            return scores
+        recids = numpy.asarray(recids, dtype=numpy.int64)
+        scores = numpy.zeros(len(recids), dtype=numpy.float32)
+        for vector, factor in self.vectors:
+            scores += numpy.float32(factor) * vector.gather(recids)
+        return scores
+
+    def rank(self, recids, limit=None):
+        """Return ``recids`` sorted by decreasing blended score.
+
+        :return: list of ``(recid, score)``
+        """
+        recids = list(recids)
+        scores = self.scores(recids)
+        if numpy is None:
+            order = sorted(range(len(recids)), key=lambda i: -scores[i])
+        else:
+            order = numpy.argsort(-scores, kind='mergesort')
+        if limit is not None:
+            order = order[:limit]
+        return [(recids[i], float(scores[i])) for i in order]
+
+
+def get_blender(collection):
+    """Return the :class:`Blender` of the rank methods of ``collection``.
+
+    Methods whose vector was never compiled are left out.
+    """
+    vectors = []
+    for method, weight in get_collection_methods(collection):
+        vector = get_rank_vector(method)
+        if vector is not None:
+            vectors.append((vector, weight))
+    return Blender(vectors)
+
+
+def blend(collection, recids, limit=None):
+    """Rank ``recids`` with the blended rank methods of ``collection``.
+
+    :return: list of ``(recid, score)``
+    """
+    return get_blender(collection).rank(recids, limit)
+
+
+__all__ = ('Blender', 'blend', 'get_blender', 'get_collection_methods', )
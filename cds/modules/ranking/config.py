@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Ranking configuration."""
+
+RANKING_TERM_COUNT_METHODS = ['demo_itc_collection']
+"""``index_term_count`` rank methods updated incrementally."""
+
+RANKING_VECTOR_METHODS = ['demo_jif', 'citation', 'citerank_citation_t',
+                          'citerank_pagerank_c', 'citerank_pagerank_t',
+                          'selfcites']
+"""Rank methods compiled into memory-mapped score vectors."""
+
+RANKING_DISPATCH = True
+"""Rank the vector methods with their vectors and compile them on rank runs."""
+
+RANKING_BLEND_METHOD = 'blend'
+"""Rank method ranking by the weighted methods of the searched collection."""
+
+RANKING_VECTOR_DIRNAME = 'rankvectors'
+"""Directory, inside ``CFG_CACHEDIR``, holding the score vectors."""
+
+RANKING_VECTOR_CHECK_INTERVAL = 10
+"""Seconds between two checks for a replaced vector file."""
+
+RANKING_SCORE_QUERIES = {
+    'citation': 'SELECT citee, COUNT(*) FROM rnkCITATIONDICT GROUP BY citee',
+    'selfcites': 'SELECT id_bibrec, count FROM rnkSELFCITES',
+}
+"""Queries returning ``(recid, score)`` of methods not in ``rnkMETHODDATA``."""
+
+RANKING_BLEND_BENCHMARK_SIZES = [10000, 100000, 1000000]
+"""Hit set sizes of ``inveniomanage ranking benchmark_blend``."""
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+
+"""Hook the score vectors into the legacy ranking.
+
+BibRank ranks the methods keeping their scores in ``rnkMETHODDATA``
+(``single_tag_rank_method`` methods such as ``demo_jif``) with
+``record_sorter.rank_by_method``, which unserializes the whole score
+dictionary of the method for every query.  :func:`rank_by_method` ranks the
+hit set with the mapped vector of the method instead, and
+:func:`into_db` compiles the vector whenever a rank run stores the scores of
+a method, so the vector follows the rank runs.
+
+The ``blend`` rank method (``RANKING_BLEND_METHOD``) has no data of its
+own: :func:`rank_by_method` ranks it by blending the weighted rank methods
+of the searched collection with :func:`~.blend.blend`.
+"""
+
+from __future__ import absolute_import
+
+from .blend import blend
+from .config import RANKING_BLEND_METHOD, RANKING_VECTOR_METHODS
+from .vectors import compile_vector, rank_by_vector
+
+
+def _legacy_result(method, ranked, voutput=''):
+    """Return ``ranked`` in the shape of the legacy rank functions.
+
+    :param ranked: list of ``(recid, score)`` by decreasing score
+    :return: ``(reclist, prefix, postfix, voutput)`` with the reclist by
+        increasing score, as ``rank_by_method`` returns it
+    """
+    from invenio.legacy.bibrank import record_sorter
+
+    configuration = getattr(record_sorter, 'methods', {}).get(method, {})
+    reclist = [[recid, score] for recid, score in reversed(ranked)]
+    return (reclist, configuration.get('prefix', ''),
+            configuration.get('postfix', ''), voutput)
+
+
+def _searched_collection():
+    """Return the name of the collection of the current search."""
+    from flask import has_request_context, request
+    from invenio.config import CFG_SITE_NAME
+
+    if has_request_context():
+        return request.values.get('cc') or CFG_SITE_NAME
+    return CFG_SITE_NAME
+
+
+def rank_by_method(rank_method_code, lwords, hitset, rank_limit_relevance,
+                   verbose):
+    """Rank ``hitset`` with the vector of ``rank_method_code``.
+
+    Replacement of ``record_sorter.rank_by_method``.  The blend method ranks
+    with the methods of the searched collection.  Queries restricting the
+    ranked records with ranges, and methods without a compiled vector, are
+    ranked by the original function.
+    """
+    if rank_method_code == RANKING_BLEND_METHOD:
+        collection = _searched_collection()
+        voutput = ''
+        if verbose > 0:
+            voutput = 'Blended the rank methods of %s.<br/>' % collection
+        return _legacy_result(rank_method_code, blend(collection, hitset),
+                              voutput)
+    if rank_method_code in RANKING_VECTOR_METHODS and \
+            not any('->' in word for word in lwords or []):
+        ranked = rank_by_vector(rank_method_code, hitset)
+        if ranked is not None:
+            voutput = ''
+            if verbose > 0:
+                voutput = 'Ranked %d records with the vector of %s.<br/>' % (
+                    len(ranked), rank_method_code)
+            return _legacy_result(rank_method_code, ranked, voutput)
+    return _original_rank_by_method(rank_method_code, lwords, hitset,
+                                    rank_limit_relevance, verbose)
+
+
+def into_db(scores, date, rank_method_code):
+    """Store the scores of a rank run and compile the vector of the method.
+
+    Replacement of ``tag_based_indexer.intoDB``.
+    """
+    result = _original_into_db(scores, date, rank_method_code)
+    if rank_method_code in RANKING_VECTOR_METHODS:
+        compile_vector(rank_method_code, scores)
+    return result
+
+
+_original_rank_by_method = None
+_original_into_db = None
+
+
+def install_rank_dispatch(install=True):
+    """Rank with the score vectors and compile them on every rank run.
+
+    :param install: ``False`` restores the original functions
+    """
+    from invenio.legacy.bibrank import record_sorter, tag_based_indexer
+
+    global _original_rank_by_method, _original_into_db
+    if record_sorter.rank_by_method is not rank_by_method:
+        _original_rank_by_method = record_sorter.rank_by_method
+    if tag_based_indexer.intoDB is not into_db:
+        _original_into_db = tag_based_indexer.intoDB
+    if install:
+        record_sorter.rank_by_method = rank_by_method
+        tag_based_indexer.intoDB = into_db
+    else:
+        if _original_rank_by_method is not None:
+            record_sorter.rank_by_method = _original_rank_by_method
+        if _original_into_db is not None:
+            tag_based_indexer.intoDB = _original_into_db
+
+
+__all__ = ('install_rank_dispatch', 'into_db', 'rank_by_method', )
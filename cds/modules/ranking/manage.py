@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Update the precomputed ranking data."""
+
+from __future__ import print_function
+
+from invenio.ext.script import Manager
+
+from .config import RANKING_BLEND_BENCHMARK_SIZES, \
+    RANKING_TERM_COUNT_METHODS, RANKING_VECTOR_METHODS
+
+manager = Manager(usage=__doc__)
+
+
+@manager.option('-m', '--method', dest='methods', action='append',
+                default=None, help='rank method (repeatable)')
+@manager.option('-f', '--full', dest='full', action='store_true',
+                help='recompute every record')
+def term_count(methods=None, full=False):
+    """Update the index_term_count methods from the modified records."""
+    import time
+
+    from .term_count import update_term_count
+
+    for method in methods or RANKING_TERM_COUNT_METHODS:
+        start = time.time()
+        stats = update_term_count(method, full)
+        print(">>> %s: %d records read, %d terms recounted, %d records "
+              "rescored in %.2fs" % (method, stats['records'],
+                                     stats['terms'], stats['rescored'],
+                                     time.time() - start))
+
+
+@manager.option('-m', '--method', dest='methods', action='append',
+                default=None, help='rank method (repeatable)')
+def vector(methods=None):
+    """Compile the score vectors from the last rank runs."""
+    import os
+
+    from .vectors import compile_vector
+
+    for method in methods or RANKING_VECTOR_METHODS:
+        path = compile_vector(method)
+        print(">>> %s: %s (%d records)" % (method, path,
+                                          os.path.getsize(path) // 4))
+
+
+@manager.option('-n', '--records', dest='records', type=int,
+                default=2000000, help='size of the synthetic vectors')
+@manager.option('-s', '--size', dest='sizes', action='append', type=int,
+                default=None, help='hit set size (repeatable)')
+@manager.option('-w', '--weight', dest='weights', action='append',
+                type=int, default=None,
+                help='weight of a synthetic method (repeatable)')
+def benchmark_blend(records=2000000, sizes=None, weights=None):
+    """Compare vectorized blending with per-record lookups."""
+    import shutil
+    import tempfile
+    import time
+
+    from .blend import Blender
+    from .vectors import RankVector, numpy, write_vector
+
+    if numpy is None:
+        print(">>> NumPy is not installed (pip install cds[ranking])")
+        return
+    # Weights of the methods of the demo articles and preprints.
+    weights = weights or [90, 80, 70, 60, 50, 80]
+    directory = tempfile.mkdtemp()
+    try:
+        vectors = []
+        for i, weight in enumerate(weights):
+            path = '%s/method%d.f32' % (directory, i)
+            write_vector(path, numpy.random.exponential(
+                10, records).astype('<f4'))
+            vectors.append((RankVector(path), weight))
+        blender = Blender(vectors)
+        for size in sizes or RANKING_BLEND_BENCHMARK_SIZES:
+            recids = numpy.sort(numpy.random.choice(records, size,
+                                                    replace=False))
+            start = time.time()
+            blender.rank(recids)
+            vectorized = time.time() - start
+
+            start = time.time()
+            scores = {}
+            for recid in recids.tolist():
+                scores[recid] = sum(factor * vector.get(recid)
+                                    for vector, factor in blender.vectors)
+            sorted(scores, key=scores.get, reverse=True)
+            lookups = time.time() - start
+            print("%8d hits: vectorized %8.3fs, per record %8.3fs, "
+                  "speed-up %.1fx" % (size, vectorized, lookups,
+                                      lookups / max(vectorized, 1e-6)))
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Ranking database models."""
+
+from invenio.ext.sqlalchemy import db
+from invenio.modules.records.models import Record as Bibrec
+
+
+class RankWatermark(db.Model):
+
+    """Modification date up to which the data of a rank method is valid."""
+
+    __tablename__ = 'rnkWATERMARK'
+
+    method = db.Column(db.String(40), primary_key=True, nullable=False)
+    last_updated = db.Column(db.DateTime, nullable=False,
+                             server_default='1900-01-01 00:00:00')
+
+
+class RankTermCount(db.Model):
+
+    """Number of records indexed under a term of an ``index_term_count``."""
+
+    __tablename__ = 'rnkTERMCOUNT'
+
+    method = db.Column(db.String(40), primary_key=True, nullable=False)
+    term = db.Column(db.String(255), primary_key=True, nullable=False)
+    hits = db.Column(db.Integer(15, unsigned=True), nullable=False,
+                     server_default='0')
+
+
+class RankTermCountRecord(db.Model):
+
+    """Term of a record ranked by an ``index_term_count`` method."""
+
+    __tablename__ = 'rnkTERMCOUNTRECORD'
+    __table_args__ = (db.Index('method_term', 'method', 'term'),
+                      db.Model.__table_args__)
+
+    method = db.Column(db.String(40), primary_key=True, nullable=False)
+    id_bibrec = db.Column(db.MediumInteger(8, unsigned=True),
+                          db.ForeignKey(Bibrec.id), primary_key=True,
+                          nullable=False)
+    term = db.Column(db.String(255), primary_key=True, nullable=False)
+
+
+__all__ = ('RankTermCount', 'RankTermCountRecord', 'RankWatermark', )
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Incremental ``index_term_count`` rank method.
+
+The legacy method scores every record having the configured tag with the
+number of records indexed under its value in the index table, and does so
+for the whole repository on every run.  Here the terms of every record and
+the hits of every term are kept in :class:`~.models.RankTermCountRecord`
+and :class:`~.models.RankTermCount`; a run only reads the records modified
+since the watermark, recounts the terms they had or now have and rescores
+the records sharing one of these terms.
+
+Only this counting is incremental.  The scores are still stored the legacy
+way, as one serialized dictionary in ``rnkMETHODDATA`` read by the search
+engine, so a run that rescores records loads and writes all of them; a run
+without modified records leaves them untouched.
+
+A record with several values of the tag gets the highest count.
+"""
+
+from __future__ import absolute_import
+
+import re
+
+from cds.utils import chunks, placeholders
+
+
+def read_config(method):
+    """Return the index table and tag of the rank method ``method``."""
+    from six.moves import configparser
+
+    from invenio.legacy.dbquery import wash_table_column_name
+    from invenio.modules.ranker.registry import configuration
+
+    config = configparser.ConfigParser()
+    config.read(configuration.get(method + '.cfg', ''))
+    index = config.get('index_term_count', 'index_table_name')
+    tag = config.get('index_term_count', 'index_term_value_from_tag')
+    return wash_table_column_name(index), wash_table_column_name(tag)
+
+
+def get_watermark(method):
+    """Return the date up to which ``method`` is up to date or ``None``."""
+    from invenio.legacy.dbquery import run_sql
+    res = run_sql('SELECT last_updated FROM rnkWATERMARK WHERE method=%s',
+                  (method, ))
+    return res[0][0] if res else None
+
+
+def set_watermark(method, date):
+    """Store the watermark of ``method``."""
+    from invenio.legacy.dbquery import run_sql
+    run_sql('INSERT INTO rnkWATERMARK (method, last_updated) VALUES (%s, %s) '
+            'ON DUPLICATE KEY UPDATE last_updated=VALUES(last_updated)',
+            (method, date))
+
+
+def _index_last_updated(index):
+    """Return when bibindex last updated the index of table ``index``."""
+    from invenio.legacy.dbquery import run_sql
+    match = re.match(r'idx[A-Z]+(\d+)[FR]$', index)
+    if not match:
+        return None
+    res = run_sql('SELECT last_updated FROM idxINDEX WHERE id=%s',
+                  (int(match.group(1)), ))
+    return res[0][0] if res else None
+
+
+def _tagged_records(tag, since=None):
+    """Return the records having ``tag`` or modified since ``since``."""
+    from invenio.legacy.dbquery import run_sql
+    if since is not None:
+        return [row[0] for row in run_sql(
+            'SELECT id FROM bibrec WHERE modification_date>=%s', (since, ))]
+    return [row[0] for row in run_sql(
+        'SELECT DISTINCT b.id_bibrec FROM bib%sx AS x '
+        'JOIN bibrec_bib%sx AS b ON b.id_bibxxx=x.id WHERE x.tag=%%s' % (
+            tag[0:2], tag[0:2]), (tag, ))]
+
+
+def _record_terms(tag, recids):
+    """Return ``{recid: set of values of tag}`` of ``recids``."""
+    from invenio.legacy.dbquery import run_sql
+    terms = {}
+    for chunk in chunks(recids):
+        for recid, value in run_sql(
+                'SELECT b.id_bibrec, x.value FROM bib%sx AS x '
+                'JOIN bibrec_bib%sx AS b ON b.id_bibxxx=x.id '
+                'WHERE x.tag=%%s AND b.id_bibrec IN (%s)' % (
+                    tag[0:2], tag[0:2], placeholders(chunk)),
+                (tag, ) + tuple(chunk)):
+            if value:
+                terms.setdefault(recid, set()).add(value)
+    return terms
+
+
+def _stored_terms(method, recids):
+    """Return ``{recid: set of terms}`` stored for ``recids``."""
+    from invenio.legacy.dbquery import run_sql
+    terms = {}
+    for chunk in chunks(recids):
+        for recid, term in run_sql(
+                'SELECT id_bibrec, term FROM rnkTERMCOUNTRECORD '
+                'WHERE method=%%s AND id_bibrec IN (%s)' %
+                placeholders(chunk), (method, ) + tuple(chunk)):
+            terms.setdefault(recid, set()).add(term)
+    return terms
+
+
+def _term_hits(index, terms):
+    """Return ``{term: number of records}`` of ``terms`` in ``index``."""
+    from intbitset import intbitset
+    from invenio.legacy.dbquery import run_sql
+    hits = dict.fromkeys(terms, 0)
+    for chunk in chunks(terms):
+        for term, hitlist in run_sql(
+                'SELECT term, hitlist FROM %s WHERE term IN (%s)' % (
+                    index, placeholders(chunk)), tuple(chunk)):
+            try:
+                hits[term] = len(intbitset(hitlist)) if hitlist else 0
+            except Exception:
+                # Be prepared for corrupted hitlists, as bibrank is.
+                hits[term] = 0
+    return hits
+
+
+def _store_terms(method, recids, terms):
+    """Replace the stored terms of ``recids``."""
+    from invenio.legacy.dbquery import run_sql
+    for chunk in chunks(recids):
+        run_sql('DELETE FROM rnkTERMCOUNTRECORD WHERE method=%%s AND '
+                'id_bibrec IN (%s)' % placeholders(chunk),
+                (method, ) + tuple(chunk))
+    rows = [(method, recid, term) for recid in recids
+            for term in terms.get(recid, ())]
+    for chunk in chunks(rows):
+        run_sql('INSERT INTO rnkTERMCOUNTRECORD (method, id_bibrec, term) '
+                'VALUES %s' % ', '.join(['(%s, %s, %s)'] * len(chunk)),
+                tuple(value for row in chunk for value in row))
+
+
+def _store_hits(method, hits):
+    """Insert or update the counts of terms."""
+    from invenio.legacy.dbquery import run_sql
+    rows = sorted(hits.items())
+    for chunk in chunks(rows):
+        run_sql('INSERT INTO rnkTERMCOUNT (method, term, hits) VALUES %s '
+                'ON DUPLICATE KEY UPDATE hits=VALUES(hits)' %
+                ', '.join(['(%s, %s, %s)'] * len(chunk)),
+                tuple(value for term, count in chunk
+                      for value in (method, term, count)))
+
+
+def _scores(method, terms):
+    """Return the scores of the records having one of ``terms``."""
+    from invenio.legacy.dbquery import run_sql
+    recids = set()
+    for chunk in chunks(terms):
+        recids.update(row[0] for row in run_sql(
+            'SELECT id_bibrec FROM rnkTERMCOUNTRECORD '
+            'WHERE method=%%s AND term IN (%s)' % placeholders(chunk),
+            (method, ) + tuple(chunk)))
+    scores = {}
+    for chunk in chunks(sorted(recids)):
+        scores.update(run_sql(
+            'SELECT r.id_bibrec, MAX(t.hits) FROM rnkTERMCOUNTRECORD AS r '
+            'JOIN rnkTERMCOUNT AS t ON t.method=r.method AND t.term=r.term '
+            'WHERE r.method=%%s AND r.id_bibrec IN (%s) '
+            'GROUP BY r.id_bibrec' % placeholders(chunk),
+            (method, ) + tuple(chunk)))
+    return scores
+
+
+def update_term_count(method, full=False):
+    """Bring the rank data of the ``index_term_count`` method up to date.
+
+    :param full: recompute every record instead of the modified ones
+    :return: dictionary with the number of ``records`` read, ``terms``
+        recounted and records ``rescored``
+    """
+    from invenio.legacy.bibrank.tag_based_indexer import fromDB, intoDB
+    from invenio.legacy.dbquery import run_sql
+
+    index, tag = read_config(method)
+    begin = run_sql('SELECT NOW()')[0][0]
+    watermark = None if full else get_watermark(method)
+    if watermark is None:
+        run_sql('DELETE FROM rnkTERMCOUNTRECORD WHERE method=%s', (method, ))
+        run_sql('DELETE FROM rnkTERMCOUNT WHERE method=%s', (method, ))
+    recids = _tagged_records(tag, watermark)
+    indexed = _index_last_updated(index)
+    if watermark is not None and not recids:
+        set_watermark(method, min(begin, indexed) if indexed else begin)
+        return dict(records=0, terms=0, rescored=0)
+
+    old_terms = _stored_terms(method, recids)
+    new_terms = _record_terms(tag, recids)
+    changed = set()
+    for terms in list(old_terms.values()) + list(new_terms.values()):
+        changed.update(terms)
+    _store_terms(method, recids, new_terms)
+    _store_hits(method, _term_hits(index, changed))
+
+    # rnkMETHODDATA holds one serialized dictionary, it is rewritten whole.
+    scores = {} if watermark is None else fromDB(method)
+    for recid in recids:
+        scores.pop(recid, None)
+    rescored = _scores(method, changed)
+    scores.update(rescored)
+    intoDB(scores, begin, method)
+
+    # Records modified before bibindex caught up are read again next time.
+    set_watermark(method, min(begin, indexed) if indexed else begin)
+    return dict(records=len(recids), terms=len(changed),
+                rescored=len(rescored))
+
+
+__all__ = ('get_watermark', 'read_config', 'set_watermark',
+           'update_term_count', )
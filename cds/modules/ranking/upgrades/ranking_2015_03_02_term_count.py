@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Create the tables of the incremental rank methods."""
+
+from invenio.modules.upgrader.api import op
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
+from sqlalchemy.dialects import mysql
+
+depends_on = ['invenio_release_1_1_0']
+
+
+def info():
+    """Return upgrade recipe information."""
+    return "Create rnkWATERMARK, rnkTERMCOUNT and rnkTERMCOUNTRECORD"
+
+
+def do_upgrade():
+    """Implement your upgrades here."""
+    tables = op.get_bind().table_names()
+    if 'rnkWATERMARK' not in tables:
+        op.create_table(
+            'rnkWATERMARK',
+            Column('method', String(40), primary_key=True, nullable=False),
+            Column('last_updated', DateTime, nullable=False,
+                   server_default='1900-01-01 00:00:00'),
+            mysql_charset='utf8',
+        )
+    if 'rnkTERMCOUNT' not in tables:
+        op.create_table(
+            'rnkTERMCOUNT',
+            Column('method', String(40), primary_key=True, nullable=False),
+            Column('term', String(255), primary_key=True, nullable=False),
+            Column('hits', mysql.INTEGER(15, unsigned=True), nullable=False,
+                   server_default='0'),
+            mysql_charset='utf8',
+        )
+    if 'rnkTERMCOUNTRECORD' not in tables:
+        op.create_table(
+            'rnkTERMCOUNTRECORD',
+            Column('method', String(40), primary_key=True, nullable=False),
+            Column('id_bibrec', mysql.MEDIUMINT(8, unsigned=True),
+                   ForeignKey('bibrec.id'), primary_key=True,
+                   nullable=False),
+            Column('term', String(255), primary_key=True, nullable=False),
+            Index('method_term', 'method', 'term'),
+            mysql_charset='utf8',
+        )
+
+
+def estimate():
+    """Estimate running time of upgrade in seconds (optional)."""
+    return 1
+
+
+def pre_upgrade():
+    """Run pre-upgrade checks (optional)."""
+    pass
+
+
+def post_upgrade():
+    """Run post-upgrade checks (optional)."""
+    pass
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Memory-mapped score vectors of rank methods.
+
+The scores a rank run stored for a method are compiled into a dense array
+of little-endian float32 indexed by recid, written to a temporary file and
+renamed over the previous vector, so readers never see a partial file.
+Every process maps the file read-only: the web workers share its pages
+through the page cache, and ranking a hit set is a gather and an argsort
+over the mapped array instead of a lookup per record.
+
+NumPy (the ``ranking`` extra) is used when installed; without it the
+vector is read with :mod:`struct` one record at a time.
+"""
+
+from __future__ import absolute_import
+
+import os
+import struct
+from array import array
+
+from cds.utils import MappedFile, MappedFiles, write_atomically
+
+from .config import RANKING_SCORE_QUERIES, RANKING_VECTOR_CHECK_INTERVAL, \
+    RANKING_VECTOR_DIRNAME, RANKING_VECTOR_METHODS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ITEMSIZE = 4
+
+
+def vector_path(method):
+    """Return the path of the score vector of ``method``."""
+    from invenio.config import CFG_CACHEDIR
+    return os.path.join(CFG_CACHEDIR, RANKING_VECTOR_DIRNAME,
+                        '%s.f32' % method)
+
+
+def get_method_scores(method):
+    """Return the ``{recid: score}`` stored by the last run of ``method``.
+
+    Methods keeping their data in their own tables are read with their
+    query in ``RANKING_SCORE_QUERIES``, the others from ``rnkMETHODDATA``.
+    """
+    from invenio.legacy.bibrank.tag_based_indexer import fromDB
+    from invenio.legacy.dbquery import run_sql
+
+    if method in RANKING_SCORE_QUERIES:
+        return dict(run_sql(RANKING_SCORE_QUERIES[method]))
+    return fromDB(method)
+
+
+def compile_vector(method, scores=None):
+    """Write the score vector of ``method`` and replace the previous one.
+
+    :param scores: ``{recid: score}``, by default read with
+        :func:`get_method_scores`
+    :return: path of the vector
+    """
+    if scores is None:
+        scores = get_method_scores(method)
+    size = max(scores) + 1 if scores else 0
+    if numpy is not None:
+        vector = numpy.zeros(size, dtype='<f4')
+        if scores:
+            vector[numpy.fromiter(scores.keys(), dtype=numpy.int64)] = \
+                numpy.fromiter(scores.values(), dtype=numpy.float64)
+    else:
+        vector = array('f', [0.0]) * size
+        for recid, score in scores.items():
+            vector[recid] = score
+        if struct.pack('=f', 1.0) != struct.pack('<f', 1.0):
+            vector.byteswap()
+
+    path = vector_path(method)
+    write_vector(path, vector)
+    return path
+
+
+def write_vector(path, vector):
+    """Atomically replace the file ``path`` with the float32 ``vector``."""
+    write_atomically(path, vector.tofile)
+
+
+class RankVector(MappedFile):
+
+    """Read-only mapping of the score vector of a method."""
+
+    def __init__(self, path):
+        super(RankVector, self).__init__(path)
+        self._maximum = None
+        self.size = self.length // ITEMSIZE
+        if numpy is not None:
+            self.scores = numpy.frombuffer(self._mmap, dtype='<f4') \
+                if self._mmap is not None else numpy.zeros(0, dtype='<f4')
+        else:
+            self.scores = None
+
+    @property
+    def maximum(self):
+        """Return the highest score, computed once per mapped file."""
+        if self._maximum is None:
+            if numpy is not None:
+                self._maximum = float(self.scores.max()) if self.size else 0.0
+            else:
+                self._maximum = max([self.get(recid)
+                                     for recid in range(self.size)] or [0.0])
+        return self._maximum
+
+    def __len__(self):
+        return self.size
+
+    def get(self, recid):
+        """Return the score of ``recid`` (0 for unknown records)."""
+        if not 0 <= recid < self.size:
+            return 0.0
+        return struct.unpack_from('<f', self._mmap, recid * ITEMSIZE)[0]
+
+    def gather(self, recids):
+        """Return the scores of ``recids``, in order."""
+        if numpy is None:
+            return [self.get(recid) for recid in recids]
+        recids = numpy.asarray(recids, dtype=numpy.int64)
+        scores = numpy.zeros(len(recids), dtype='<f4')
+        known = recids < self.size
+        scores[known] = self.scores[recids[known]]
+        return scores
+
+    def rank(self, recids, limit=None):
+        """Return ``recids`` sorted by decreasing score.
+
+        Ties keep the order of ``recids``.
+
+        :param limit: return only the best ``limit`` records
+        :return: list of ``(recid, score)``
+        """
+        recids = list(recids)
+        scores = self.gather(recids)
+        if numpy is None:
+            order = sorted(range(len(recids)), key=lambda i: -scores[i])
+        else:
+            order = numpy.argsort(-scores, kind='mergesort')
+        if limit is not None:
+            order = order[:limit]
+        return [(recids[i], float(scores[i])) for i in order]
+
+
+_vectors = MappedFiles(RankVector, RANKING_VECTOR_CHECK_INTERVAL)
+
+
+def get_rank_vector(method):
+    """Return the mapped vector of ``method``, remapped if it was replaced.
+
+    :return: :class:`RankVector` or ``None`` if it was never compiled
+    """
+    return _vectors.get(vector_path(method))
+
+
+def rank_by_vector(method, recids, limit=None):
+    """Rank ``recids`` with the vector of ``method``.
+
+    :return: list of ``(recid, score)`` or ``None`` if the vector of the
+        method was never compiled
+    """
+    vector = get_rank_vector(method)
+    return vector.rank(recids, limit) if vector is not None else None
+
+
+def warmup(app):
+    """Map the vectors before the workers are forked."""
+    for method in app.config.get('RANKING_VECTOR_METHODS',
+                                 RANKING_VECTOR_METHODS):
+        get_rank_vector(method)
+
+
+__all__ = ('RankVector', 'compile_vector', 'get_method_scores',
+           'get_rank_vector', 'rank_by_vector', 'vector_path', 'warmup',
+           'write_vector', )
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Bulk and request scoped access to the files attached to records."""
+
+from __future__ import absolute_import
+
+from flask import appcontext_tearing_down
+
+from invenio.base.signals import record_after_create, record_after_update
+
+from .receivers import log_cache_stats, record_updated
+
+record_after_create.connect(record_updated)
+record_after_update.connect(record_updated)
+appcontext_tearing_down.connect(log_cache_stats)
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Bulk access to the files attached to records.
+
+:class:`~invenio.legacy.bibdocfile.api.BibRecDocs` works on one record at a
+time and most getters of the files it returns go back to the database or to
+the file system.  The functions below read the same information for a whole
+list of records with a fixed number of queries, which is what result pages
+need.
+"""
+
+from __future__ import absolute_import
+
+import os
+
+from flask import g, has_app_context
+from six.moves import cPickle
+from six.moves.urllib.parse import quote
+
+from cds.utils import placeholders
+
+
+def _load_more_info(docids):
+    """Return descriptions and comments of the given documents.
+
+    :param docids: list of document identifiers
+    :return: dictionary ``{(docid, version, format, key): value}``
+    """
+    from invenio.legacy.dbquery import run_sql
+
+    more_info = {}
+    if not docids:
+        return more_info
+    res = run_sql(
+        "SELECT id_bibdoc, version, format, data_key, data_value "
+        "FROM bibdocmoreinfo "
+        "WHERE namespace='' AND data_key IN ('description', 'comment') "
+        "AND id_bibdoc IN (%s)" % placeholders(docids), tuple(docids))
+    for docid, version, docformat, key, value in res:
+        try:
+            value = cPickle.loads(value)
+        except Exception:
+            pass
+        more_info[(docid, version, docformat, key)] = value
+    return more_info
+
+
+def get_files_from_bibdoc_bulk(recids):
+    """Retrieve the latest files of several records at once.
+
+    It runs three queries for the whole list (documents, file system
+    information and descriptions/comments) and lists the directory of each
+    document once, instead of building one ``BibRecDocs`` per record.
+
+    :param recids: iterable of record identifiers
+    :return: dictionary ``{recid: [file_dict, ...]}`` where every file
+        dictionary has the same keys as the ones built by
+        :func:`~cds.base.recordext.functions.get_files_from_bibdoc.get_files_from_bibdoc`
+    """
+    from invenio.config import CFG_SITE_RECORD, CFG_SITE_URL
+    from invenio.legacy.dbquery import run_sql
+    from invenio.legacy.bibdocfile.api import _make_base_dir, \
+        get_magic_guesses, get_subformat_from_format, \
+        get_superformat_from_format
+
+    recids = sorted(set(int(recid) for recid in recids
+                        if recid and int(recid) > 0))
+    files = dict((recid, []) for recid in recids)
+    if not recids:
+        return files
+
+    documents = run_sql(
+        "SELECT brbd.id_bibrec, brbd.id_bibdoc, brbd.docname, brbd.type, "
+        "bd.status FROM bibrec_bibdoc AS brbd "
+        "JOIN bibdoc AS bd ON bd.id=brbd.id_bibdoc "
+        "WHERE bd.status<>'DELETED' AND brbd.id_bibrec IN (%s) "
+        "ORDER BY brbd.id_bibrec, brbd.docname" % placeholders(recids),
+        tuple(recids))
+    docids = sorted(set(row[1] for row in documents))
+    if not docids:
+        return files
+
+    latest = {}
+    for docid, version, docformat, size in run_sql(
+            "SELECT id_bibdoc, version, format, filesize FROM bibdocfsinfo "
+            "WHERE last_version=true AND id_bibdoc IN (%s) "
+            "ORDER BY format" % placeholders(docids), tuple(docids)):
+        latest.setdefault(docid, []).append((version, docformat, size))
+    more_info = _load_more_info(docids)
+
+    for recid, docid, docname, doctype, status in documents:
+        basedir = _make_base_dir(docid)
+        try:
+            on_disk = set(os.listdir(basedir))
+        except OSError:
+            continue
+        for version, docformat, size in latest.get(docid, []):
+            filename = '%s%s;%s' % (docname, docformat, version)
+            if filename not in on_disk:
+                continue
+            full_path = os.path.join(basedir, filename)
+            superformat = get_superformat_from_format(docformat)
+            files[recid].append({
+                'comment': more_info.get(
+                    (docid, version, docformat, 'comment')),
+                'description': more_info.get(
+                    (docid, version, docformat, 'description')),
+                'eformat': docformat,
+                'full_name': docname + superformat,
+                'full_path': full_path,
+                'magic': get_magic_guesses(full_path),
+                'name': docname,
+                'path': full_path,
+                'size': size,
+                'status': status,
+                'subformat': get_subformat_from_format(docformat),
+                'superformat': superformat,
+                'type': doctype,
+                'url': '%s/%s/%s/files/%s%s' % (
+                    CFG_SITE_URL, CFG_SITE_RECORD, recid, quote(docname),
+                    quote(superformat)),
+                'version': version,
+            })
+    return files
+
+
+def file_to_dict(afile):
+    """Return the dictionary describing a ``BibDocFile``."""
+    return {
+        'comment': afile.get_comment(),
+        'description': afile.get_description(),
+        'eformat': afile.get_format(),
+        'full_name': afile.get_full_name(),
+        'full_path': afile.get_full_path(),
+        'magic': afile.get_magic(),
+        'name': afile.get_name(),
+        'path': afile.get_path(),
+        'size': afile.get_size(),
+        'status': afile.get_status(),
+        'subformat': afile.get_subformat(),
+        'superformat': afile.get_superformat(),
+        'type': afile.get_type(),
+        'url': afile.get_url(),
+        'version': afile.get_version(),
+    }
+
+
+class RecordFilesCache(object):
+
+    """Request scoped cache of the file model of records.
+
+    ``get_bibdoc``, ``get_filetypes`` and ``get_files_from_bibdoc`` all read
+    from the instance returned by :func:`current_cache`, so the file model
+    of a record is built at most once per request.  The cache lives and dies
+    with the request: it is never shared between requests or processes, so
+    file changes made elsewhere are seen by the next request without any
+    invalidation.
+    """
+
+    def __init__(self):
+        self.bibdocs = {}
+        self.bibrecdocs = {}
+        self.files = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, store, recid, factory):
+        if recid in store:
+            self.hits += 1
+            return store[recid]
+        self.misses += 1
+        value = store[recid] = factory(recid)
+        return value
+
+    @staticmethod
+    def _load_bibdoc(recid):
+        from invenio.legacy.bibdocfile.api import BibDoc, \
+            InvenioBibDocFileError
+        try:
+            return BibDoc(recid)
+        except InvenioBibDocFileError:
+            return None
+
+    @staticmethod
+    def _load_bibrecdocs(recid):
+        from invenio.legacy.bibdocfile.api import BibRecDocs, \
+            InvenioBibDocFileError
+        try:
+            return BibRecDocs(recid)
+        except InvenioBibDocFileError:
+            return None
+
+    def _load_files(self, recid):
+        bibrecdocs = self.get_bibrecdocs(recid)
+        if bibrecdocs is None:
+            return []
+        return [file_to_dict(afile)
+                for afile in bibrecdocs.list_latest_files()]
+
+    def get_bibdoc(self, recid):
+        """Return the ``BibDoc`` built by ``get_bibdoc`` or ``None``."""
+        return self._get(self.bibdocs, int(recid), self._load_bibdoc)
+
+    def get_bibrecdocs(self, recid):
+        """Return the ``BibRecDocs`` of ``recid`` or ``None``."""
+        return self._get(self.bibrecdocs, int(recid), self._load_bibrecdocs)
+
+    def get_files(self, recid):
+        """Return the list of file dictionaries of ``recid``."""
+        return self._get(self.files, int(recid), self._load_files)
+
+    def prefetch_files(self, recids):
+        """Load the files of all ``recids`` with a fixed number of queries.
+
+        Records already in the cache are not loaded again.
+        """
+        missing = [int(recid) for recid in recids
+                   if int(recid) not in self.files]
+        self.files.update(get_files_from_bibdoc_bulk(missing))
+
+    def invalidate(self, recid=None):
+        """Forget the file model of ``recid`` or of every record."""
+        if recid is None:
+            self.bibdocs.clear()
+            self.bibrecdocs.clear()
+            self.files.clear()
+            return
+        for store in (self.bibdocs, self.bibrecdocs, self.files):
+            store.pop(int(recid), None)
+
+    @property
+    def stats(self):
+        """Return the hit and miss counters of the cache."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'records': len(set(self.bibdocs) | set(self.bibrecdocs) |
+                               set(self.files))}
+
+
+def current_cache():
+    """Return the record file cache of the current request.
+
+    Outside of an application context a new, empty cache is returned on
+    every call, i.e. nothing is cached, so the callers keep working (e.g.
+    inside ``bibupload``) and always see the current files.
+    """
+    if not has_app_context():
+        return RecordFilesCache()
+    cache = getattr(g, '_cds_record_files', None)
+    if cache is None:
+        cache = g._cds_record_files = RecordFilesCache()
+    return cache
+
+
+def prefetch_files(recids):
+    """Load the files of ``recids`` for the rest of the current request.
+
+    Once prefetched, the ``files`` calculated field of these records costs no
+    further query.
+    """
+    current_cache().prefetch_files(recids)
+
+
+def invalidate_files(recid=None):
+    """Drop ``recid`` (or every record) from the current request cache.
+
+    Called when a record is created or updated (see :mod:`.receivers`), so
+    a request that changes the files of a record, e.g. with an FFT, reads
+    them again; other requests and processes have their own caches.
+    """
+    if has_app_context():
+        current_cache().invalidate(recid)
+
+
+def get_cache_stats():
+    """Return the hit and miss counters of the current request cache.
+
+    They are also logged at debug level when the context is torn down.
+    """
+    return current_cache().stats
+
+
+__all__ = ('RecordFilesCache', 'current_cache', 'file_to_dict',
+           'get_cache_stats', 'get_files_from_bibdoc_bulk',
+           'invalidate_files', 'prefetch_files', )
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+
+"""Invalidation and reporting of the request record file cache."""
+
+from __future__ import absolute_import
+
+from flask import current_app, g
+
+from .api import get_cache_stats, invalidate_files
+
+
+def record_updated(sender, recid=None, **kwargs):
+    """Forget the files of a record updated (e.g. by an FFT) in this request.
+
+    Without a record identifier every record is forgotten.
+    """
+    invalidate_files(recid)
+
+
+def log_cache_stats(sender, **kwargs):
+    """Log the hits and misses of the cache when the context is torn down."""
+    if getattr(g, '_cds_record_files', None) is None:
+        return
+    stats = get_cache_stats()
+    if stats['hits'] or stats['misses']:
+        current_app.logger.debug(
+            'Record file cache: %(hits)d hits, %(misses)d misses, '
+            '%(records)d records', stats)
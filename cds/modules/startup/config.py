@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Startup configuration."""
+
+STARTUP_WARMUP = [
+    'cds.modules.startup.warmup:field_definitions',
+    'cds.modules.startup.warmup:collection_caches',
+    'cds.modules.startup.warmup:format_templates',
+    'cds.modules.collectiontree.api:warmup',
+    'cds.modules.ranking.vectors:warmup',
+    'cds.modules.counters.citations:warmup',
+    'cds.modules.kbcache.api:warmup',
+]
+"""Steps loading the immutable structures before the workers are forked."""
+
+STARTUP_GC_FREEZE = True
+"""Move the objects loaded by the warmup out of the garbage collector."""
+
+STARTUP_GC_THRESHOLD = 100
+"""Oldest generation threshold used where :func:`gc.freeze` is missing."""
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Import time of the application startup.
+
+Python 2 has no ``-X importtime``; :func:`trace_imports` wraps the builtin
+``__import__`` instead and records the cumulative time of the first import
+of every module, nested imports included.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from six.moves import builtins
+
+
+class ImportTrace(object):
+
+    """Cumulative and self time of the modules imported while tracing."""
+
+    def __init__(self):
+        self.modules = {}
+        self.order = []
+        self.top_level = set()
+        self._stack = []
+
+    def record(self, name, cumulative, nested):
+        """Store the times of the first import of ``name``."""
+        if name not in self.modules:
+            self.modules[name] = (cumulative, cumulative - nested)
+            self.order.append(name)
+            if not self._stack:
+                self.top_level.add(name)
+
+    def report(self, prefix=None, limit=None, sort='cumulative'):
+        """Return ``(name, cumulative, self)`` sorted by ``sort`` time."""
+        index = 1 if sort == 'self' else 0
+        rows = [(name, ) + self.modules[name] for name in self.order
+                if prefix is None or name == prefix or
+                name.startswith(prefix + '.')]
+        rows.sort(key=lambda row: row[1 + index], reverse=True)
+        return rows[:limit] if limit else rows
+
+    @property
+    def total(self):
+        """Time spent importing the top level modules."""
+        return sum(self.modules[name][0] for name in self.top_level)
+
+
+@contextmanager
+def trace_imports():
+    """Record the modules first imported inside the ``with`` block."""
+    trace = ImportTrace()
+    original_import = builtins.__import__
+
+    def traced_import(name, globals=None, locals=None, fromlist=(),
+                      level=-1 if sys.version_info[0] < 3 else 0):
+        before = set(sys.modules)
+        trace._stack.append(0.0)
+        start = time.time()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.time() - start
+            nested = trace._stack.pop()
+            if trace._stack:
+                trace._stack[-1] += elapsed
+            # Modules loaded by nested imports are already recorded; of
+            # the others the deepest one is what this call imported and
+            # the rest are its parent packages.
+            loaded = [module for module in set(sys.modules) - before
+                      if sys.modules[module] is not None and
+                      module not in trace.modules]
+            if loaded:
+                module = max(loaded, key=lambda module: module.count('.'))
+                trace.record(module, elapsed, nested)
+
+    builtins.__import__ = traced_import
+    try:
+        yield trace
+    finally:
+        builtins.__import__ = original_import
+
+
+def profile_create_app():
+    """Create the application while tracing imports.
+
+    :return: tuple ``(trace, seconds)``
+    """
+    from invenio.base.factory import create_app
+    with trace_imports() as trace:
+        start = time.time()
+        create_app()
+        seconds = time.time() - start
+    return trace, seconds
+
+
+def profile_startup():
+    """Trace :func:`profile_create_app` in a fresh interpreter.
+
+    The calling process has already imported the application, so the
+    profile runs in a child process and is read back as JSON.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'cds.modules.startup.importtime'])
+    data = json.loads(output.decode('utf-8').splitlines()[-1])
+    trace = ImportTrace()
+    for name, cumulative, own in data['modules']:
+        trace.modules[name] = (cumulative, own)
+        trace.order.append(name)
+    trace.top_level.update(data['top_level'])
+    return trace, data['seconds']
+
+
+if __name__ == '__main__':
+    trace, seconds = profile_create_app()
+    print(json.dumps({
+        'seconds': seconds,
+        'top_level': sorted(trace.top_level),
+        'modules': [(name, ) + trace.modules[name] for name in trace.order],
+    }))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Profile the application startup."""
+
+from __future__ import print_function
+
+from invenio.ext.script import Manager
+
+manager = Manager(usage=__doc__)
+
+
+def print_imports(rows):
+    """Print cumulative and self import time of every module."""
+    for name, cumulative, own in rows:
+        print("%8.1fms %8.1fms  %s" % (cumulative * 1000, own * 1000, name))
+
+
+@manager.option('-p', '--prefix', dest='prefix', default='cds',
+                help='report only modules of this package ("" for all)')
+@manager.option('-n', '--limit', dest='limit', type=int, default=30,
+                help='number of modules to print')
+@manager.option('-s', '--sort', dest='sort', default='cumulative',
+                choices=('cumulative', 'self'), help='sort order')
+def importtime(prefix='cds', limit=30, sort='cumulative'):
+    """Report the modules imported while creating the application."""
+    from .importtime import profile_startup
+    trace, seconds = profile_startup()
+    rows = trace.report(prefix or None, limit, sort)
+    print(">>> create_app: %.2fs, %d modules imported in %.2fs" % (
+        seconds, len(trace.modules), trace.total))
+    print("%10s %10s  %s" % ('cumulative', 'self', 'module'))
+    print_imports(rows)
+
+
+def print_profile(title, rows, limit):
+    """Print the most expensive rows of a startup profile."""
+    print("%10s %10s  %s" % ('time', 'memory', title))
+    for name, seconds, memory in sorted(
+            rows, key=lambda row: row[1], reverse=True)[:limit]:
+        print("%8.1fms %8.1fMB  %s" % (seconds * 1000, memory / 2.0 ** 20,
+                                       name))
+
+
+@manager.option('-r', '--role', dest='role', default=None,
+                choices=('web', 'worker', 'cli'),
+                help='application role to profile (CDS_APP_ROLE)')
+@manager.option('-n', '--limit', dest='limit', type=int, default=None,
+                help='number of extensions and blueprints to print')
+def profile(role=None, limit=None):
+    """Report the time and memory every extension and blueprint adds."""
+    from .profile import profile_startup
+    result = profile_startup(role)
+    print(">>> create_app: %.2fs, %.1fMB resident memory" % (
+        result.seconds, result.memory / 2.0 ** 20))
+    print_profile('extension', result.extensions, limit)
+    print_profile('blueprint', result.blueprints, limit)
+
+
+@manager.command
+def warmup():
+    """Run the pre-fork warmup and report its steps."""
+    from flask import current_app
+
+    from .warmup import warmup as run_warmup
+    print_profile('step', run_warmup(current_app._get_current_object()),
+                  None)
+
+
+@manager.option('pids', metavar='PID', type=int, nargs='+',
+                help='worker processes, or their master with --master')
+@manager.option('-m', '--master', dest='master', action='store_true',
+                help='report the children of the given processes')
+def memory(pids, master=False):
+    """Report the resident and shared memory of the workers."""
+    from .memory import child_pids, memory_usage
+    if master:
+        pids = [child for pid in pids for child in child_pids(pid)]
+    mb = 2.0 ** 20
+    total = dict(rss=0, pss=0, shared=0, private=0)
+    print("%8s %10s %10s %10s %10s" % ('pid', 'rss', 'pss', 'shared',
+                                       'private'))
+    for pid in pids:
+        usage = memory_usage(pid)
+        for key in total:
+            total[key] += usage[key]
+        print("%8d %8.1fMB %8.1fMB %8.1fMB %8.1fMB" % (
+            pid, usage['rss'] / mb, usage['pss'] / mb, usage['shared'] / mb,
+            usage['private'] / mb))
+    print("%8s %8.1fMB %8.1fMB %8.1fMB %8.1fMB" % (
+        'total', total['rss'] / mb, total['pss'] / mb, total['shared'] / mb,
+        total['private'] / mb))
+    if total['rss']:
+        print("shared: %.0f%% of the resident memory" % (
+            100.0 * total['shared'] / total['rss']))
+
+
+def main():
+    """Execute manager."""
+    from invenio.base.factory import create_app
+    app = create_app()
+    manager.app = app
+    manager.run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Memory usage of the running processes."""
+
+import os
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def resident_memory(pid='self'):
+    """Return the resident set size of a process in bytes.
+
+    Reads ``/proc/<pid>/statm``, which is cheap enough to call around every
+    extension; returns 0 on systems without ``/proc``.
+    """
+    try:
+        with open('/proc/%s/statm' % pid) as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (IOError, OSError, IndexError, ValueError):
+        return 0
+
+
+def memory_usage(pid='self'):
+    """Return the resident, proportional, shared and private memory in bytes.
+
+    Pages still shared with the parent after a fork count as shared; they
+    are read from ``/proc/<pid>/smaps_rollup`` or summed from ``smaps`` on
+    older kernels.
+    """
+    usage = dict(rss=0, pss=0, shared=0, private=0)
+    keys = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared',
+            'Shared_Dirty': 'shared', 'Private_Clean': 'private',
+            'Private_Dirty': 'private'}
+    for name in ('smaps_rollup', 'smaps'):
+        try:
+            with open('/proc/%s/%s' % (pid, name)) as smaps:
+                for line in smaps:
+                    key, _, value = line.partition(':')
+                    if key in keys:
+                        usage[keys[key]] += int(value.split()[0]) * 1024
+            return usage
+        except (IOError, OSError):
+            continue
+    return usage
+
+
+def child_pids(pid):
+    """Return the ids of the processes whose parent is ``pid``."""
+    children = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open('/proc/%s/stat' % name) as stat:
+                # The command name may contain spaces, skip past it.
+                fields = stat.read().rsplit(')', 1)[1].split()
+        except (IOError, OSError, IndexError):
+            continue
+        if int(fields[1]) == int(pid):
+            children.append(int(name))
+    return sorted(children)
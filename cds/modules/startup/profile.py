@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Wall time and memory added by every extension and blueprint.
+
+:func:`profile_app` must run in a fresh interpreter: it wraps
+:func:`werkzeug.utils.import_string`, which loads the ``EXTENSIONS``, before
+the application factory imports it, and :meth:`flask.Flask.register_blueprint`.
+Blueprints are discovered one package at a time, so a blueprint is charged
+with everything that happened since the previous extension or blueprint
+finished, i.e. mostly the import of its views.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .memory import resident_memory
+
+
+class StartupProfile(object):
+
+    """Timeline of the extensions and blueprints of one application."""
+
+    def __init__(self):
+        self.extensions = []
+        self.blueprints = []
+        self.seconds = 0.0
+        self.memory = 0
+        self.mark()
+
+    def mark(self):
+        """Start a new segment of the timeline."""
+        self._time, self._memory = time.time(), resident_memory()
+
+    def add(self, rows, name, start, memory):
+        """Append ``name`` with the time and memory used since ``start``."""
+        rows.append((name, time.time() - start, resident_memory() - memory))
+        self.mark()
+
+    def to_dict(self):
+        """Return a JSON serializable profile."""
+        return dict(extensions=self.extensions, blueprints=self.blueprints,
+                    seconds=self.seconds, memory=self.memory)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a profile returned by :meth:`to_dict`."""
+        profile = cls()
+        profile.extensions = [tuple(row) for row in data['extensions']]
+        profile.blueprints = [tuple(row) for row in data['blueprints']]
+        profile.seconds, profile.memory = data['seconds'], data['memory']
+        return profile
+
+
+def _measure_extension(profile, name, ext):
+    """Return a callable setting up ``ext`` and charging it to ``name``."""
+    setup = getattr(ext, 'setup_app', ext)
+
+    def setup_app(app, *args, **kwargs):
+        start, memory = profile._time, profile._memory
+        try:
+            return setup(app, *args, **kwargs)
+        finally:
+            profile.add(profile.extensions, name, start, memory)
+    return setup_app
+
+
+def profile_app(extensions):
+    """Create the application and profile it.
+
+    :param extensions: names in ``EXTENSIONS`` to time, the other
+        :func:`~werkzeug.utils.import_string` calls are left alone
+    """
+    import flask
+    from werkzeug import utils
+
+    profile = StartupProfile()
+    import_string = utils.import_string
+    register_blueprint = flask.Flask.register_blueprint
+    extensions = set(extensions)
+
+    def measured_import_string(import_name, *args, **kwargs):
+        if import_name not in extensions:
+            return import_string(import_name, *args, **kwargs)
+        profile.mark()
+        ext = import_string(import_name, *args, **kwargs)
+        return _measure_extension(profile, import_name, ext)
+
+    def measured_register_blueprint(self, blueprint, *args, **kwargs):
+        start, memory = profile._time, profile._memory
+        try:
+            return register_blueprint(self, blueprint, *args, **kwargs)
+        finally:
+            profile.add(profile.blueprints, blueprint.name, start, memory)
+
+    utils.import_string = measured_import_string
+    flask.Flask.register_blueprint = measured_register_blueprint
+    try:
+        from invenio.base.factory import create_app
+        start, memory = time.time(), resident_memory()
+        create_app()
+        profile.seconds = time.time() - start
+        profile.memory = resident_memory() - memory
+    finally:
+        utils.import_string = import_string
+        flask.Flask.register_blueprint = register_blueprint
+    return profile
+
+
+def profile_startup(role=None):
+    """Run :func:`profile_app` in a fresh interpreter.
+
+    :param role: value of ``CDS_APP_ROLE`` for the profiled application
+    """
+    env = dict(os.environ)
+    if role:
+        env['CDS_APP_ROLE'] = role
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'cds.modules.startup.profile'], env=env)
+    return StartupProfile.from_dict(
+        json.loads(output.decode('utf-8').splitlines()[-1]))
+
+
+if __name__ == '__main__':
+    from cds.config import EXTENSIONS
+    print(json.dumps(profile_app(EXTENSIONS).to_dict()))
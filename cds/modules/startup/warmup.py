@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Load the immutable structures before the workers are forked.
+
+Workers forked from a warmed-up master share its pages copy-on-write
+instead of each building the field definitions, collection caches and
+format templates after the fork.  Once loaded, the objects are moved out of
+the garbage collector (:func:`gc.freeze`) so that collections in the
+workers do not write to, and thereby copy, the shared pages.  The database
+connections opened by the steps are closed so that no socket is shared
+with the workers.
+"""
+
+import gc
+import time
+
+from werkzeug.utils import import_string
+
+from .config import STARTUP_GC_FREEZE, STARTUP_GC_THRESHOLD, STARTUP_WARMUP
+from .memory import resident_memory
+
+
+def field_definitions(app):
+    """Load the compiled JSONAlchemy field definitions."""
+    from invenio.modules.jsonalchemy.parser import FieldParser
+
+    from cds.modules.fielddefs.api import load_field_definitions
+    from cds.modules.fielddefs.config import FIELDDEFS_NAMESPACES
+
+    for namespace in FIELDDEFS_NAMESPACES:
+        if namespace not in FieldParser._field_definitions:
+            load_field_definitions(namespace)
+
+
+def collection_caches(app):
+    """Fill the collection caches of the legacy search engine."""
+    from invenio.legacy import search_engine
+
+    for name in ('collection_reclist_cache', 'collection_i18nname_cache',
+                 'field_i18nname_cache', 'restricted_collection_cache'):
+        cacher = getattr(search_engine, name, None)
+        if cacher is not None:
+            cacher.recreate_cache_if_needed()
+
+
+def format_templates(app):
+    """Parse the output formats and format templates."""
+    from invenio.modules.formatter import engine
+
+    engine.get_output_formats(with_attributes=True)
+    engine.get_format_templates(with_attributes=True)
+
+
+def close_connections():
+    """Close the database connections opened in this process."""
+    from invenio.ext.sqlalchemy import db
+    from invenio.legacy.dbquery import close_connection
+
+    close_connection()
+    db.engine.dispose()
+
+
+def freeze():
+    """Keep the garbage collector away from the objects loaded so far."""
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    else:
+        # Without a permanent generation, make the full collections that
+        # traverse every object rare.
+        threshold0, threshold1 = gc.get_threshold()[:2]
+        gc.set_threshold(threshold0, threshold1, STARTUP_GC_THRESHOLD)
+
+
+def warmup(app, steps=None):
+    """Run the warmup ``steps`` and freeze the loaded objects.
+
+    The database connections opened by the steps are closed afterwards.
+
+    :param steps: import strings of the steps, defaults to
+        ``STARTUP_WARMUP``
+    :return: list of ``(step, seconds, memory)``
+    """
+    if steps is None:
+        steps = app.config.get('STARTUP_WARMUP', STARTUP_WARMUP)
+    report = []
+    with app.app_context():
+        for step in steps:
+            start, memory = time.time(), resident_memory()
+            import_string(step)(app)
+            report.append((step, time.time() - start,
+                           resident_memory() - memory))
+        close_connections()
+    if app.config.get('STARTUP_GC_FREEZE', STARTUP_GC_FREEZE):
+        freeze()
+    return report
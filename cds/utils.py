@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of CDS.
+## Copyright (C) 2015 CERN.
+##
+## CDS is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## CDS is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with CDS. If not, see <http://www.gnu.org/licenses/>.
+##
+## In applying this licence, CERN does not waive the privileges and immunities
+## granted to it by virtue of its status as an Intergovernmental Organization
+## or submit itself to any jurisdiction.
+
+
+"""Helpers shared by the CDS modules.
+
+SQL ``IN`` clauses are built in chunks, and the caches compiled to files
+(score vectors, citation counts, field definitions, fixtures) are written
+atomically and mapped read-only by every process, which checks at an
+interval whether the file was replaced.
+"""
+
+from __future__ import absolute_import
+
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+CHUNK_SIZE = 1000
+"""Default number of values in one ``IN`` clause."""
+
+
+def chunks(values, size=CHUNK_SIZE):
+    """Yield lists of at most ``size`` successive ``values``."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def placeholders(values):
+    """Return the placeholders of ``values`` for an ``IN (...)`` clause."""
+    return ', '.join(['%s'] * len(values))
+
+
+def write_atomically(path, write):
+    """Replace the file ``path`` with what ``write(f)`` writes to ``f``.
+
+    The content is written to a temporary file of the same directory which
+    is then renamed, so a concurrent reader never sees a partial file.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.chmod(tmp_path, 0o644)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class MappedFile(object):
+
+    """Read-only mapping of a file replaced with :func:`write_atomically`."""
+
+    def __init__(self, path):
+        self.path = path
+        self.checked = time.time()
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime)
+            self.length = stat.st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                if stat.st_size else None
+
+    def is_current(self):
+        """Return whether the file was not replaced since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return (stat.st_ino, stat.st_mtime) == self.identity
+
+    def check(self):
+        """Run the periodic checks of the mapping, see :class:`MappedFiles`."""
+
+
+class MappedFiles(object):
+
+    """Mappings of a process, remapped when their file is replaced.
+
+    Files are checked at most every ``interval`` seconds, so the lookup of
+    a mapping usually costs no system call.
+    """
+
+    def __init__(self, factory, interval):
+        """Map files with ``factory(path)``, a :class:`MappedFile` class."""
+        self.factory = factory
+        self.interval = interval
+        self._mapped = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Return the mapping of ``path`` or ``None`` if it does not exist."""
+        mapped = self._mapped.get(path)
+        if mapped is not None and \
+                time.time() - mapped.checked < self.interval:
+            return mapped
+        with self._lock:
+            if mapped is None or not mapped.is_current():
+                try:
+                    mapped = self._mapped[path] = self.factory(path)
+                except (IOError, OSError):
+                    return None
+            mapped.checked = time.time()
+            mapped.check()
+        return mapped
+
+    def clear(self):
+        """Forget every mapping."""
+        with self._lock:
+            self._mapped.clear()
+
+
+__all__ = ('CHUNK_SIZE', 'MappedFile', 'MappedFiles', 'chunks',
+           'placeholders', 'write_atomically', )
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+## This file is part of Invenio.
+## Copyright (C) 2014 CERN.
+##
+## Invenio is free software; you can redistribute it and/or
+## modify it under the terms of the GNU General Public License as
+## published by the Free Software Foundation; either version 2 of the
+## License, or (at your option) any later version.
+##
+## Invenio is distributed in the hope that it will be useful, but
+## WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+## General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with Invenio; if not, write to the Free Software Foundation, Inc.,
+## 59 Temple Place, Suite 330, Boston, MA 02D111-1307, USA.
+
+"""WSGI application warmed up before the workers are forked.
+
+Serve it from a preforking server that imports the application in the
+master, e.g. ``gunicorn --preload cds.wsgi:application`` or uWSGI without
+``lazy-apps``; the workers then share the structures loaded by
+:func:`cds.modules.startup.warmup.warmup`.
+"""
+
+from invenio.base.factory import create_app
+
+from cds.modules.startup.warmup import warmup
+
+application = create_app()
+warmup(application)
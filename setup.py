@@ -54,6 +54,9 @@ setup(
             "Flask-DebugToolbar>=0.9",
             'setuptools-bower>=0.2'
         ],
+        'ranking': [
+            "numpy>=1.7",
+        ],
     },
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',